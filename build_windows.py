@@ -1,12 +1,128 @@
 #!/usr/bin/env python3
 """Build executable locally."""
+import argparse
+import importlib.util
+import os
 import subprocess
 import sys
-import shutil
 import platform
+import re
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+SPEC_FILE = "raysid-app.spec"
+
+# Heavy modules the app never imports; each one excluded skips an import-graph walk
+RECOMMENDED_EXCLUDES = {
+    "tkinter", "unittest", "pydoc", "test",
+    "PyQt5.QtWebEngineWidgets", "PyQt5.QtQml", "PyQt5.QtMultimedia",
+    "numpy.f2py", "numpy.testing", "scipy.tests",
+}
+
+# Already-compressed members gain nothing from deflate, store them as-is
+STORED_SUFFIXES = ('.pyd', '.dll', '.so', '.zip', '.png', '.jpg')
+
+
+def _check_onedir_spec():
+    """Refuse to build a onefile bundle.
+
+    Onefile executables unpack the whole bundle to a temp dir on every
+    launch; the folder (onedir) layout starts several seconds faster.
+    """
+    spec_text = Path(SPEC_FILE).read_text(encoding="utf-8")
+    if "onefile" in spec_text.lower() or "COLLECT(" not in spec_text:
+        print(f"❌ {SPEC_FILE} must produce a folder build (COLLECT), not onefile!")
+        sys.exit(1)
+
+
+def _check_spec_excludes():
+    """Warn if the spec no longer excludes the recommended heavy modules."""
+    spec_text = Path(SPEC_FILE).read_text(encoding="utf-8")
+    match = re.search(r"excludes\s*=\s*\[(.*?)\]", spec_text, re.DOTALL)
+    excluded = set(re.findall(r"['\"]([\w.]+)['\"]", match.group(1))) if match else set()
+    missing = sorted(RECOMMENDED_EXCLUDES - excluded)
+    if missing:
+        print(f"⚠ {SPEC_FILE} does not exclude: {', '.join(missing)}")
+        print("  Add them to Analysis(excludes=[...]) for a smaller bundle and faster analysis.")
+
+
+def _fast_rmtree(path):
+    """Remove a directory tree, unlinking files in parallel.
+
+    PyInstaller bundles hold thousands of small files; deleting them one
+    by one is slow on NTFS. Directories are removed bottom-up afterwards.
+    """
+    files = []
+    dirs = [os.fspath(path)]
+    stack = [os.fspath(path)]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    dirs.append(entry.path)
+                    stack.append(entry.path)
+                else:
+                    files.append(entry.path)
+
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as pool:
+        # list() drains the iterator so unlink errors are raised here
+        list(pool.map(os.unlink, files))
+
+    for directory in sorted(dirs, key=lambda d: d.count(os.sep), reverse=True):
+        os.rmdir(directory)
+
+
+def _make_archive_fast(src_dir: Path, out_path: Path):
+    """Zip src_dir into out_path using fast deflate and parallel file reads.
+
+    Member names are prefixed with src_dir's name, like shutil.make_archive.
+    """
+    files = []
+    for root, _dirs, names in os.walk(src_dir):
+        for name in names:
+            files.append(Path(root) / name)
+    files.sort()
+
+    workers = os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=workers) as pool, \
+            zipfile.ZipFile(out_path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+        # Worker threads read at most workers * 2 files ahead (Executor.map
+        # would submit them all and hold the whole bundle in memory); this
+        # thread is the only writer
+        queued = iter(files)
+        pending = deque()
+
+        def submit_next():
+            path = next(queued, None)
+            if path is not None:
+                pending.append((path, pool.submit(path.read_bytes)))
+
+        for _ in range(workers * 2):
+            submit_next()
+        while pending:
+            path, future = pending.popleft()
+            data = future.result()
+            submit_next()
+            arcname = (src_dir.name / path.relative_to(src_dir)).as_posix()
+            info = zipfile.ZipInfo.from_file(path, arcname)
+            if path.name.lower().endswith(STORED_SUFFIXES):
+                info.compress_type = zipfile.ZIP_STORED
+            else:
+                info.compress_type = zipfile.ZIP_DEFLATED
+            zf.writestr(info, data, compresslevel=1)
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Build Raysid App executable.")
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="remove build/ and dist/ and let PyInstaller rebuild from scratch",
+    )
+    args = parser.parse_args()
+
     platform_name = platform.system()
     print(f"Building Raysid App for {platform_name}...")
     
@@ -18,24 +134,33 @@ def main():
         sys.exit(1)
     
     # Check if PyInstaller is installed
-    try:
-        import PyInstaller
-    except ImportError:
+    if importlib.util.find_spec("PyInstaller") is None:
         print("ERROR: PyInstaller not found. Installing...")
         subprocess.run([sys.executable, "-m", "pip", "install", "-r", "requirements-build.txt"], check=True)
     
-    # Clean previous builds
+    _check_spec_excludes()
+    
+    # Clean previous builds (only on --fresh, so warm rebuilds reuse PyInstaller's cache)
     print("\n[1/3] Cleaning previous builds...")
-    for path in ["build", "dist"]:
-        if Path(path).exists():
-            shutil.rmtree(path)
-            print(f"  Removed {path}/")
+    if args.fresh:
+        for path in ["build", "dist"]:
+            if Path(path).exists():
+                _fast_rmtree(path)
+                print(f"  Removed {path}/")
+    else:
+        for old_archive in Path("dist").glob("raysid-app-*.zip"):
+            old_archive.unlink()
+            print(f"  Removed {old_archive}")
     
     # Build executable
     print("\n[2/3] Building executable (this may take a few minutes)...")
+    _check_onedir_spec()
     # Use the Python executable from the current environment to run PyInstaller
+    pyinstaller_args = ["--noconfirm", "--workpath", "build", SPEC_FILE]
+    if args.fresh:
+        pyinstaller_args.insert(0, "--clean")
     result = subprocess.run(
-        [sys.executable, "-m", "PyInstaller", "--clean", "--noconfirm", "raysid-app.spec"],
+        [sys.executable, "-m", "PyInstaller", *pyinstaller_args],
         capture_output=False
     )
     
@@ -53,7 +178,7 @@ def main():
     # Create zip
     platform_name = platform.system().lower()
     archive_name = f"dist/raysid-app-{platform_name}-x64"
-    shutil.make_archive(archive_name, "zip", "dist", "raysid-app")
+    _make_archive_fast(dist_folder, Path(f"{archive_name}.zip"))
     
     # Determine executable name based on platform
     exe_name = "raysid-app.exe" if platform_name == "windows" else "raysid-app"
@@ -62,7 +187,8 @@ def main():
     print(f"\n📦 Output:")
     print(f"   Folder: dist/raysid-app/")
     print(f"   Executable: dist/raysid-app/{exe_name}")
-    print(f"   Archive: {archive_name}.zip")
+    print(f"   Archive: {archive_name}.zip  (redistributable form)")
+    print(f"   {exe_name} next to _internal/ is the fast-start form (no per-launch extraction)")
     print(f"\n💡 Test the executable:")
     print(f"   cd dist/raysid-app && ./{exe_name}")
 
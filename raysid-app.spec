@@ -32,11 +32,18 @@ a = Analysis(
     excludes=[
         'tkinter',
         'unittest',
+        'pydoc',
         'test',
         'tests',
         'PIL',
         'IPython',
         'jupyter',
+        'PyQt5.QtWebEngineWidgets',
+        'PyQt5.QtQml',
+        'PyQt5.QtMultimedia',
+        'numpy.f2py',
+        'numpy.testing',
+        'scipy.tests',
     ],
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
@@ -55,7 +62,10 @@ exe = EXE(
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
+    # No UPX: it adds per-launch decompression cost; we compress once in the
+    # outer zip. (--noupx can't be used instead, PyInstaller 6 rejects
+    # makespec options when building from a .spec file.)
+    upx=False,
     console=True,  # Show console for debugging
     disable_windowed_traceback=False,
     argv_emulation=False,
@@ -71,7 +81,7 @@ coll = COLLECT(
     a.zipfiles,
     a.datas,
     strip=False,
-    upx=True,
+    upx=False,  # see EXE above
     upx_exclude=[],
     name='raysid-app',
 )
@@ -8,10 +8,14 @@ Desktop GUI for interfacing with Raysid gamma spectrometer devices via BLE:
 - Live spectrum plot with peak detection
 - Battery / temperature status
 """
+import multiprocessing
 import os
 import sys
-import signal
-import asyncio
+import threading
+
+
+# Resolved Qt platform plugin dir, so repeated calls skip the lookup
+_QT_PLUGINS_PATH_CACHE = None
 
 
 def _ensure_qt_platform_plugin():
@@ -22,6 +26,11 @@ def _ensure_qt_platform_plugin():
     and pointing QT_QPA_PLATFORM_PLUGIN_PATH there. This works regardless of whether
     the package is installed in a venv, user site-packages, or system-wide.
     """
+    global _QT_PLUGINS_PATH_CACHE
+    if _QT_PLUGINS_PATH_CACHE is not None:
+        os.environ.setdefault("QT_QPA_PLATFORM_PLUGIN_PATH", _QT_PLUGINS_PATH_CACHE)
+        return
+
     if "QT_QPA_PLATFORM_PLUGIN_PATH" in os.environ:
         return  # User already set it, don't override
     
@@ -31,6 +40,7 @@ def _ensure_qt_platform_plugin():
         plugins_path = os.path.join(pyqt5_path, "Qt5", "plugins", "platforms")
         
         if os.path.isdir(plugins_path):
+            _QT_PLUGINS_PATH_CACHE = plugins_path
             os.environ["QT_QPA_PLATFORM_PLUGIN_PATH"] = plugins_path
     except ImportError:
         pass  # PyQt5 not installed, will fail later with clear error
@@ -39,10 +49,8 @@ def _ensure_qt_platform_plugin():
 # Must be called before importing any PyQt5 modules
 _ensure_qt_platform_plugin()
 
-from PyQt5.QtWidgets import QApplication
-import qasync
-
-from raysid.widgets.main_window import MainWindow
+# How often (ms) batched BLE packets are flushed from the worker to the GUI
+BLE_FLUSH_MS = 50
 
 # Global references for signal handler
 _window = None
@@ -55,15 +63,76 @@ def signal_handler(sig, frame):
     if _window:
         _window.force_cleanup()
     if _loop:
+        # Let main() run the structured teardown instead of exiting here
         _loop.call_soon_threadsafe(_loop.stop)
-    sys.exit(0)
+
+
+def _cancel_all(loop, keep=()):
+    """Cancel pending tasks on loop (except those in keep) and wait for them."""
+    import asyncio
+
+    tasks = [task for task in asyncio.all_tasks(loop) if not task.done() and task not in keep]
+    for task in tasks:
+        task.cancel()
+    if tasks:
+        loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+
+
+def _shutdown(loop, window, timeout=2.0):
+    """Finish the BLE disconnect and cancel leftover tasks once the loop stopped.
+
+    A disconnect already scheduled by window.force_cleanup() is awaited
+    first, so the cancel sweep does not interrupt it halfway through bleak;
+    otherwise a still-connected worker is disconnected here.
+    """
+    import asyncio
+
+    pending = window.disconnect_task
+    keep = () if pending is None else (pending,)
+    try:
+        if pending is not None and not pending.done():
+            # Cancelled by wait_for only if it overruns the timeout
+            loop.run_until_complete(asyncio.wait_for(pending, timeout))
+    except (RuntimeError, asyncio.CancelledError, asyncio.TimeoutError, OSError) as e:
+        print(f"shutdown: {e}")
+    try:
+        _cancel_all(loop, keep)
+        if pending is None and window.ble_worker and window.ble_worker.connected:
+            loop.run_until_complete(
+                asyncio.wait_for(window.ble_worker.disconnect(), timeout)
+            )
+    except (RuntimeError, asyncio.CancelledError, asyncio.TimeoutError, OSError) as e:
+        print(f"shutdown: {e}")
 
 
 def main():
     """Entry point for raysid-app command."""
     global _window, _loop
-    
+
+    # Heavy imports are deferred so importing this module stays cheap
+    import asyncio
+    import logging
+    import signal
+
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtGui import QFont, QFontDatabase
+    from PyQt5.QtWidgets import QApplication
+    import qasync
+
+    from raysid.widgets.main_window import MainWindow
+
+    # Console logging, INFO unless overridden (e.g. RAYSID_LOG=DEBUG)
+    level = getattr(logging, os.getenv("RAYSID_LOG", "INFO").upper(), None)
+    if not isinstance(level, int):
+        level = logging.INFO
+    logging.basicConfig(level=level, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    # Application attributes must be set before QApplication is created
+    QApplication.setAttribute(Qt.AA_ShareOpenGLContexts, True)
     app = QApplication(sys.argv)
+    # Populate the font database once, up front, with a single fixed app font
+    app.setFont(QFont("Segoe UI" if sys.platform == "win32" else "Sans", 9))
+    QFontDatabase()
     app.setApplicationName("Raysid App")
     app.setOrganizationName("Raysid")
 
@@ -74,25 +143,25 @@ def main():
 
     window = MainWindow(loop)
     _window = window
+    window.set_batch_flush_interval_ms(BLE_FLUSH_MS)
     window.show()
 
-    # Setup signal handlers for clean shutdown
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
+    # Setup signal handlers for clean shutdown (only possible in the main
+    # thread of the main process; skip in spawned/bootloader children)
+    if (threading.current_thread() is threading.main_thread()
+            and multiprocessing.current_process().name == "MainProcess"):
+        signal.signal(signal.SIGINT, signal_handler)
+        signal.signal(signal.SIGTERM, signal_handler)
 
-    try:
-        with loop:
+    with loop:
+        try:
             loop.run_forever()
-    except KeyboardInterrupt:
-        print("\nKeyboard interrupt, cleaning up...")
-        window.force_cleanup()
-    finally:
-        # Ensure BLE is disconnected
-        if window.ble_worker and window.ble_worker.connected:
-            try:
-                loop.run_until_complete(window.ble_worker.disconnect())
-            except:
-                pass
+        except KeyboardInterrupt:
+            print("\nKeyboard interrupt, cleaning up...")
+            window.force_cleanup()
+        finally:
+            # Ensure BLE is disconnected while the loop is still open
+            _shutdown(loop, window)
 
 
 if __name__ == "__main__":
@@ -4,18 +4,38 @@ from __future__ import annotations
 import asyncio
 import logging
 import os
+import queue
+import struct
+import sys
+import threading
 import time
 from datetime import datetime
 from typing import Optional, Callable, Dict
 
+import numpy as np
 from PyQt5.QtCore import QObject, pyqtSignal
 
 from bleak import BleakClient
 
+try:
+    import numba
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# Per-packet trace logging is opt-in (RAYSID_DEBUG=1); errors are always logged
+DEBUG = bool(os.getenv("RAYSID_DEBUG"))
+# Colored console feedback only makes sense on an interactive terminal
+_TTY = sys.stdout is not None and sys.stdout.isatty()
+
+# Little-endian 16-bit header/value fields
+_U16LE = struct.Struct("<H")
+
 # File logger for debugging (writes to user's home directory)
 _log_path = os.path.join(os.path.expanduser("~"), ".raysid_debug.log")
 try:
-    _log_file = open(_log_path, "a", encoding="utf-8")
+    # Line-buffered: each entry reaches the file without an explicit flush()
+    _log_file = open(_log_path, "a", buffering=1, encoding="utf-8")
 except (IOError, PermissionError):
     _log_file = None
 
@@ -25,26 +45,231 @@ def log_to_file(msg: str):
     ts = datetime.now().strftime("%H:%M:%S.%f")[:-3]
     try:
         _log_file.write(f"{ts} {msg}\n")
-        _log_file.flush()
     except (UnicodeEncodeError, OSError):
         pass  # Silently ignore encoding errors
 
 
+def _spectrum_out_size(start_x: int, max_channel: int) -> int:
+    """Size of the decode buffer for a frame starting at start_x.
+
+    The outer loop stops at max_channel, but one control byte can still
+    emit up to 63 points past it, and the first value is written at
+    start_x unconditionally.
+    """
+    return max(start_x + 1, max_channel + 64)
+
+
+def _make_spectrum_decoder(div: int):
+    """Build a spectrum decoder specialised for one div (1/3/9).
+
+    div and 1/div are closure constants, so under Numba each variant
+    compiles with the normalisation folded in (a no-op for div=1).
+    """
+    # Multiply instead of dividing per sample
+    inv_div = 1.0 / div
+
+    def decode(frame, x, cur_val, limit, max_channel, out):
+        """Decode the diff-encoded spectrum body into out[x:], return last x + 1.
+
+        frame is the raw frame (bytes, or a uint8 array when JIT-compiled).
+        Decoding starts at byte 7 with cur_val already taken from the header.
+        Diffs are sign-extended branchlessly as (v ^ sign_bit) - sign_bit.
+        """
+        # First value - single channel, normalized by div
+        out[x] = cur_val * inv_div
+        x += 1
+
+        pos = 7
+        # One bound for both the payload limit and the buffer end
+        end = min(limit, len(frame))
+        while pos < end and x < max_channel:
+            b = int(frame[pos])
+
+            # Special case: bytes[pos]==0 means pointType=4, pointsAmount=1
+            if b == 0:
+                point_type = 4
+                points_amount = 1
+            else:
+                point_type = (b & 0xFF) // 64
+                points_amount = (b & 0xFF) % 64
+
+            pos += 1
+
+            if point_type == 0:
+                # 2 values in 1 byte (4-bit nibbles)
+                amount = 0
+                while amount < points_amount and pos < end:
+                    bytev = int(frame[pos])
+                    # High nibble
+                    diff = (((bytev & 0xFF) // 16) ^ 0x8) - 0x8
+                    cur_val += diff
+                    out[x] = cur_val * inv_div
+                    x += 1
+                    amount += 1
+
+                    if amount < points_amount:
+                        # Low nibble
+                        diff = (((bytev & 0xFF) % 16) ^ 0x8) - 0x8
+                        cur_val += diff
+                        out[x] = cur_val * inv_div
+                        x += 1
+                        amount += 1
+
+                    pos += 1
+
+            elif point_type == 1:
+                # 1 value in 1 byte (signed 8-bit)
+                amount = 0
+                while amount < points_amount and pos < end:
+                    diff = ((int(frame[pos]) & 0xFF) ^ 0x80) - 0x80
+                    cur_val += diff
+                    out[x] = cur_val * inv_div
+                    x += 1
+                    amount += 1
+                    pos += 1
+
+            elif point_type == 2:
+                # 2 values in 3 bytes (12-bit each)
+                amount = 0
+                while amount < points_amount and pos + 1 < end:
+                    b0 = int(frame[pos])
+                    b1 = int(frame[pos + 1])
+
+                    # First 12-bit value
+                    diff = ((((b0 << 4) | ((b1 >> 4) & 0xF)) & 0xFFF) ^ 0x800) - 0x800
+                    cur_val += diff
+                    out[x] = cur_val * inv_div
+                    x += 1
+                    amount += 1
+                    pos += 2
+
+                    if amount < points_amount and pos < end:
+                        b2 = int(frame[pos])
+                        # Second 12-bit value
+                        diff = ((((b1 & 0xF) << 8) | (b2 & 0xFF)) ^ 0x800) - 0x800
+                        cur_val += diff
+                        out[x] = cur_val * inv_div
+                        x += 1
+                        amount += 1
+                        pos += 1
+
+            elif point_type == 3:
+                # 1 value in 2 bytes (signed 16-bit, little-endian)
+                amount = 0
+                while amount < points_amount and pos + 1 < end:
+                    diff = ((((int(frame[pos + 1]) & 0xFF) << 8) | (int(frame[pos]) & 0xFF)) ^ 0x8000) - 0x8000
+                    cur_val += diff
+                    out[x] = cur_val * inv_div
+                    x += 1
+                    amount += 1
+                    pos += 2
+
+            elif point_type == 4:
+                # 1 value in 3 bytes (signed 24-bit, little-endian)
+                if pos + 2 < end:
+                    diff = (((int(frame[pos + 2]) << 16) | (int(frame[pos + 1]) << 8) | int(frame[pos])) ^ 0x800000) - 0x800000
+                    cur_val += diff
+                    out[x] = cur_val * inv_div
+                    x += 1
+                    pos += 3
+                else:
+                    break
+
+            else:
+                break
+
+        return x
+
+    decode.__name__ = decode.__qualname__ = f"_decode_spectrum_div{div}"
+    if HAS_NUMBA:
+        # nogil: lets the parse thread decode while the event loop runs
+        return numba.njit(cache=True, nogil=True, boundscheck=False)(decode)
+    return decode
+
+
+# Packet type -> (div, specialised decoder)
+_SPECTRUM_DECODERS = {
+    0x30: (1, _make_spectrum_decoder(1)),
+    0x31: (3, _make_spectrum_decoder(3)),
+    0x32: (9, _make_spectrum_decoder(9)),
+}
+
+
+def _crc1_kernel(arr):
+    """_crc1 over a uint8 array: little-endian 32-bit word sum, modulo 2**32."""
+    crc = 0
+    for i in range(arr.size):
+        crc = (crc + (int(arr[i]) << (8 * (i % 4)))) & 0xFFFFFFFF
+    return crc
+
+
+def _checksum3_kernel(arr):
+    """_checksum3 over a uint8 array: XOR of 3-byte big-endian words."""
+    out = 0
+    n = arr.size
+    for i in range(0, n, 3):
+        value = int(arr[i]) << 16
+        if i + 1 < n:
+            value |= int(arr[i + 1]) << 8
+        if i + 2 < n:
+            value |= int(arr[i + 2])
+        out ^= value
+    return out & 0xFFFFFF
+
+
+if HAS_NUMBA:
+    # Compiled loops beat NumPy's per-call overhead on these tiny buffers
+    _crc1_kernel = numba.njit(cache=True, nogil=True, boundscheck=False)(_crc1_kernel)
+    _checksum3_kernel = numba.njit(cache=True, nogil=True, boundscheck=False)(_checksum3_kernel)
+
+
+def _warm_jit_kernels():
+    """Trigger JIT compilation (or cache load) before the first real frame.
+
+    Frames always reach the kernels as np.frombuffer() views of bytes, which
+    are read-only arrays - a different Numba type from a writable array, so
+    the warm-up has to use the same kind of buffer.
+    """
+    frame = np.frombuffer(bytes(16), dtype=np.uint8)
+    _crc1_kernel(frame)
+    _checksum3_kernel(frame)
+    for div, decode in _SPECTRUM_DECODERS.values():
+        max_channel = 1800 // div + 10
+        out = np.zeros(_spectrum_out_size(0, max_channel), dtype=np.float64)
+        decode(frame, 0, 0, 13, max_channel, out)
+
+
 class BleWorker(QObject):
     """Handles BLE communication with Raysid device."""
 
     # Signals
-    packet_received = pyqtSignal(dict)
+    packets_received = pyqtSignal(list)  # batch of parsed packet dicts
     connection_lost = pyqtSignal()
 
+    # Parsed packets are batched and emitted at most once per this interval
+    DEFAULT_FLUSH_MS = 50
+    # Complete frames waiting for the parse thread; overflow is dropped
+    FRAME_QUEUE_SIZE = 64
+
     # Nordic UART UUIDs
     TX_UUID = "49535343-8841-43f4-a8d4-ecbe34729bb3"
     RX_UUID = "49535343-1e4d-4bd9-ba61-23c647249616"
 
     # Packet types
-    SPECTRUM_TYPES = {0x30, 0x31, 0x32}
+    SPECTRUM_TYPES = frozenset({0x30, 0x31, 0x32})
+    # Types that can start a frame (spectrum, battery, CPS)
+    _FRAME_START_TYPES = SPECTRUM_TYPES | {0x02, 0x17}
+
+    # Sent twice after connecting
+    HELLO = bytes([0xFF, 0xEE, 0xEE, 0x17, 0x64, 0x8F, 0x32, 0x12, 0x00, 0x64, 0x17, 0x20, 0x8F, 0x0E])
+
+    # Command frame layout: [0xFF][crc2][0xEE][crc1 x4][payload...][size]
+    _CRC2_POS = 1
+    _CRC1_POS = 3
+    _PAYLOAD_POS = 7
 
-    def __init__(self, address: str, loop: asyncio.AbstractEventLoop):
+    def __init__(self, address: str, loop: asyncio.AbstractEventLoop,
+                 flush_interval_ms: int = DEFAULT_FLUSH_MS):
         super().__init__()
         self.address = address
         self.device_address = address  # For reconnect
@@ -58,14 +283,25 @@ class BleWorker(QObject):
         self.spectrum_div = 1
         self.spectrum_cur_val = 0
 
-        # Stream buffer for reassembly (unused now, kept for compatibility)
-        self._buffer = bytearray()
-        
         # Separate buffer for spectrum packets (256 bytes, fragmented over ~13 notifications)
         self._spectrum_buffer = bytearray()
         self._spectrum_expected_len = 0
-        self._spectrum_buffer_start_time = 0.0  # For timeout detection
+        self._spectrum_buffer_start_time = 0.0  # time.monotonic(), for timeout detection
+
+        # Frames are parsed off the event loop; the parse thread batches
+        # the results and emits them every flush_interval_ms
+        self.flush_interval_ms = flush_interval_ms
+        self._frame_queue: queue.Queue = queue.Queue(maxsize=self.FRAME_QUEUE_SIZE)
+        self._parse_thread: Optional[threading.Thread] = None
+        self._pending_packets = []
+
+        # Prebuilt command frames; PING only needs tab/time and checksums patched
+        self._ping_frame = bytearray(self._wrap_command(bytes([0x12, 0, 0, 0, 0, 0])))
+        self._full_spectrum_request = self._wrap_command(self._spectrum_request_payload(0, 1799))
         
+        if HAS_NUMBA:
+            _warm_jit_kernels()
+
         log_to_file("=== BleWorker initialized ===")
 
     async def connect(self):
@@ -76,14 +312,14 @@ class BleWorker(QObject):
         if not self.client.is_connected:
             raise RuntimeError("Failed to connect")
 
+        self._start_parser()
         await self.client.start_notify(self.RX_UUID, self._notification_handler)
         self.connected = True
 
         # Send HELLO packets
-        hello = bytes([0xFF, 0xEE, 0xEE, 0x17, 0x64, 0x8F, 0x32, 0x12, 0x00, 0x64, 0x17, 0x20, 0x8F, 0x0E])
-        await self.client.write_gatt_char(self.TX_UUID, hello)
+        await self.client.write_gatt_char(self.TX_UUID, self.HELLO)
         await asyncio.sleep(0.2)
-        await self.client.write_gatt_char(self.TX_UUID, hello)
+        await self.client.write_gatt_char(self.TX_UUID, self.HELLO)
 
         self.logger.info("Connected to %s", self.address)
 
@@ -93,10 +329,12 @@ class BleWorker(QObject):
             await self.client.stop_notify(self.RX_UUID)
             await self.client.disconnect()
         self.connected = False
+        self._stop_parser()
         self.logger.info("Disconnected")
 
     def _on_disconnect(self, client):
         self.connected = False
+        self._stop_parser()
         self.connection_lost.emit()
 
     async def send_ping(self, tab: int):
@@ -105,16 +343,14 @@ class BleWorker(QObject):
             return
         try:
             unix = int(time.time())
-            payload = bytes([
-                0x12,
-                tab & 0xFF,
-                (unix >> 24) & 0xFF,
-                (unix >> 16) & 0xFF,
-                (unix >> 8) & 0xFF,
-                unix & 0xFF,
-            ])
-            packet = self._wrap_command(payload)
-            await self.client.write_gatt_char(self.TX_UUID, packet)
+            frame = self._ping_frame
+            p = self._PAYLOAD_POS
+            # Payload: [0x12][tab][unix, 4 bytes big-endian]
+            frame[p + 1] = tab & 0xFF
+            frame[p + 2:p + 6] = (unix & 0xFFFFFFFF).to_bytes(4, 'big')
+            frame[self._CRC1_POS:p] = self._crc1(frame[p:p + 6]).to_bytes(4, 'big')
+            frame[self._CRC2_POS] = self._crc2(frame[self._CRC2_POS + 1:p + 6])
+            await self.client.write_gatt_char(self.TX_UUID, bytes(frame))
         except Exception as e:
             self.logger.warning(f"send_ping failed: {e}")
             # Connection likely lost, trigger disconnect
@@ -126,18 +362,24 @@ class BleWorker(QObject):
         if not self.connected or not self.client:
             return
         try:
-            payload = bytes([
-                0x3E,
-                (start >> 8) & 0xFF,
-                start & 0xFF,
-                ((end + 1) >> 8) & 0xFF,
-                (end + 1) & 0xFF,
-            ])
-            packet = self._wrap_command(payload)
+            if start == 0 and end == 1799:
+                packet = self._full_spectrum_request
+            else:
+                packet = self._wrap_command(self._spectrum_request_payload(start, end))
             await self.client.write_gatt_char(self.TX_UUID, packet)
         except Exception as e:
             self.logger.warning(f"request_spectrum failed: {e}")
 
+    @staticmethod
+    def _spectrum_request_payload(start: int, end: int) -> bytes:
+        return bytes([
+            0x3E,
+            (start >> 8) & 0xFF,
+            start & 0xFF,
+            ((end + 1) >> 8) & 0xFF,
+            (end + 1) & 0xFF,
+        ])
+
     def _wrap_command(self, payload: bytes) -> bytes:
         """Wrap payload in Raysid protocol frame."""
         crc1 = self._crc1(payload)
@@ -150,24 +392,14 @@ class BleWorker(QObject):
 
     @staticmethod
     def _crc1(data: bytes) -> int:
-        crc = 0
-        i = 0
-        ln = len(data)
-        while i < ln:
-            rem = ln - i
-            if rem >= 4:
-                crc += (data[i+3] << 24) | (data[i+2] << 16) | (data[i+1] << 8) | data[i]
-                i += 4
-            elif rem == 3:
-                crc += (data[i+2] << 16) | (data[i+1] << 8) | data[i]
-                i += 3
-            elif rem == 2:
-                crc += (data[i+1] << 8) | data[i]
-                i += 2
-            else:
-                crc += data[i]
-                i += 1
-        return crc & 0xFFFFFFFF
+        """Sum of little-endian 32-bit words (tail zero-padded), modulo 2**32."""
+        if HAS_NUMBA:
+            # bytes() keeps the array read-only (the warmed-up signature);
+            # it is a no-op for bytes and copies the few bytes of a bytearray
+            return _crc1_kernel(np.frombuffer(bytes(data), dtype=np.uint8))
+        pad = (-len(data)) % 4
+        buf = bytes(data) + b"\x00" * pad
+        return int(np.frombuffer(buf, dtype='<u4').sum(dtype=np.uint32)) & 0xFFFFFFFF
 
     @staticmethod
     def _crc2(data: bytes) -> int:
@@ -183,19 +415,18 @@ class BleWorker(QObject):
         Used to validate spectrum packets (type 0x30/0x31/0x32).
         Spectrum frame structure: [len][type][...data...][chk1][chk2][chk3]
         where checksum3 is calculated over all bytes EXCEPT the last 3 checksum bytes.
+        A trailing partial word is zero-padded on the right.
         """
-        out = 0
-        length = len(data)
-        for i in range(0, length, 3):
-            value = 0
-            if i < length:
-                value |= (data[i] & 0xFF) << 16
-            if i + 1 < length:
-                value |= (data[i + 1] & 0xFF) << 8
-            if i + 2 < length:
-                value |= data[i + 2] & 0xFF
-            out ^= value
-        return out & 0xFFFFFF
+        arr = np.frombuffer(bytes(data), dtype=np.uint8)
+        if HAS_NUMBA:
+            return _checksum3_kernel(arr)
+        if arr.size == 0:
+            return 0
+        pad = (-arr.size) % 3
+        if pad:
+            arr = np.concatenate([arr, np.zeros(pad, np.uint8)])
+        w = arr.reshape(-1, 3).astype(np.uint32)
+        return int(np.bitwise_xor.reduce((w[:, 0] << 16) | (w[:, 1] << 8) | w[:, 2])) & 0xFFFFFF
 
     def _validate_spectrum_checksum(self, frame: bytes) -> bool:
         """Validate spectrum packet checksum (last 3 bytes, little-endian).
@@ -209,7 +440,7 @@ class BleWorker(QObject):
         # Last 3 bytes are checksum (little-endian)
         chk_bytes = frame[-3:]
         # Convert from little-endian to integer
-        expected = (chk_bytes[2] << 16) | (chk_bytes[1] << 8) | chk_bytes[0]
+        expected = int.from_bytes(chk_bytes, "little")
         
         # Calculate checksum over all bytes except the last 3
         core = frame[:-3]
@@ -220,12 +451,13 @@ class BleWorker(QObject):
         length = frame[0] or 256
         
         if is_valid:
-            msg = f"{self.GREEN}[SPECTRUM ✓ ACCEPT]{self.RESET} type=0x{ptype:02X} len={length} checksum={expected:06X}"
-            print(msg)
-            log_to_file(f"[SPECTRUM ✓ ACCEPT] type=0x{ptype:02X} len={length} checksum={expected:06X}")
+            if _TTY:
+                print(f"{self.GREEN}[SPECTRUM ✓ ACCEPT]{self.RESET} type=0x{ptype:02X} len={length} checksum={expected:06X}")
+            if DEBUG:
+                log_to_file(f"[SPECTRUM ✓ ACCEPT] type=0x{ptype:02X} len={length} checksum={expected:06X}")
         else:
-            msg = f"{self.RED}[SPECTRUM ✗ REJECT]{self.RESET} type=0x{ptype:02X} len={length} expected={expected:06X} calculated={calculated:06X}"
-            print(msg)
+            if _TTY:
+                print(f"{self.RED}[SPECTRUM ✗ REJECT]{self.RESET} type=0x{ptype:02X} len={length} expected={expected:06X} calculated={calculated:06X}")
             log_to_file(f"[SPECTRUM ✗ REJECT] type=0x{ptype:02X} len={length} expected={expected:06X} calculated={calculated:06X}")
         
         return is_valid
@@ -240,16 +472,18 @@ class BleWorker(QObject):
         raw = bytes(data)
         # Verbose log disabled - uncomment for debugging:
         # log_to_file(f"[NOTIFY] len={len(raw)} raw={raw.hex()}")
-        
-        now = time.time()
+
+        # Hot path: work on locals, write state back only when it changes
+        spec_buf = self._spectrum_buffer
+        expected = self._spectrum_expected_len
         
         # Timeout check - if buffer is stale (>500ms), reset it
-        if self._spectrum_expected_len > 0:
-            elapsed = now - self._spectrum_buffer_start_time
+        if expected > 0:
+            elapsed = time.monotonic() - self._spectrum_buffer_start_time
             if elapsed > 0.5:
                 log_to_file(f"[SPEC BUFFER] TIMEOUT after {elapsed:.3f}s - resetting")
-                self._spectrum_buffer.clear()
-                self._spectrum_expected_len = 0
+                spec_buf.clear()
+                expected = self._spectrum_expected_len = 0
         
         # Check if this looks like a new packet start (has valid length and type)
         is_new_packet = False
@@ -257,31 +491,34 @@ class BleWorker(QObject):
             length_byte = raw[0]
             ptype = raw[1]
             # Valid packet types we recognize
-            if ptype in self.SPECTRUM_TYPES or ptype in {0x02, 0x17}:
+            if ptype in self._FRAME_START_TYPES:
                 declared_len = 256 if length_byte == 0 else length_byte
                 if 4 <= declared_len <= 256:
                     is_new_packet = True
         
         # If we're assembling a 256-byte spectrum and this looks like a new packet,
         # cancel the current assembly (data corruption recovery)
-        if self._spectrum_expected_len > 0 and is_new_packet and len(raw) > 10:
+        if expected > 0 and is_new_packet and len(raw) > 10:
             log_to_file(f"[SPEC BUFFER] RESET - new packet detected while assembling")
-            self._spectrum_buffer.clear()
-            self._spectrum_expected_len = 0
+            spec_buf.clear()
+            expected = self._spectrum_expected_len = 0
         
         # Check if we're currently assembling a 256-byte spectrum packet
-        if self._spectrum_expected_len > 0:
+        if expected > 0:
             # Continue assembling spectrum
-            self._spectrum_buffer.extend(raw)
-            log_to_file(f"[SPEC BUFFER] added {len(raw)}, total={len(self._spectrum_buffer)}/{self._spectrum_expected_len}")
+            spec_buf.extend(raw)
+            if DEBUG:
+                log_to_file(f"[SPEC BUFFER] added {len(raw)}, total={len(spec_buf)}/{expected}")
             
-            if len(self._spectrum_buffer) >= self._spectrum_expected_len:
-                # Complete spectrum packet
-                frame = bytes(self._spectrum_buffer[:self._spectrum_expected_len])
-                log_to_file(f"[SPEC COMPLETE] len={len(frame)}")
-                self._spectrum_buffer.clear()
+            if len(spec_buf) >= expected:
+                # Complete spectrum packet - the buffer is reused, so the
+                # parse thread gets its own copy (one copy, via a view)
+                if DEBUG:
+                    log_to_file(f"[SPEC COMPLETE] len={expected}")
+                with memoryview(spec_buf) as view:
+                    self._submit_frame(bytes(view[:expected]))
+                spec_buf.clear()
                 self._spectrum_expected_len = 0
-                self._parse_frame(frame)
             return
         
         # New packet - check type
@@ -294,33 +531,82 @@ class BleWorker(QObject):
             # because they can arrive fragmented across multiple notifications
             if ptype in self.SPECTRUM_TYPES:
                 # Start buffering spectrum (small or large)
-                self._spectrum_buffer = bytearray(raw)
+                spec_buf.clear()
+                spec_buf.extend(raw)
                 self._spectrum_expected_len = declared_len
-                self._spectrum_buffer_start_time = now
-                log_to_file(f"[SPEC START] type=0x{ptype:02X} len={declared_len} buffering {len(raw)}/{declared_len}")
+                self._spectrum_buffer_start_time = time.monotonic()
+                if DEBUG:
+                    log_to_file(f"[SPEC START] type=0x{ptype:02X} len={declared_len} buffering {len(raw)}/{declared_len}")
                 return
         
-        # Complete packet (CPS, Battery) - parse directly
-        self._parse_frame(raw)
+        # Complete packet (CPS, Battery) - hand over as is
+        self._submit_frame(raw)
 
-    def _process_buffer(self):
-        """Extract and parse complete frames from buffer."""
-        while len(self._buffer) >= 4:
-            length_byte = self._buffer[0]
-            declared = 256 if length_byte == 0 else length_byte
+    def _submit_frame(self, frame: bytes):
+        """Queue a complete frame for the parse thread (drops it when full)."""
+        try:
+            self._frame_queue.put_nowait(frame)
+        except queue.Full:
+            log_to_file(f"[PARSE] queue full - dropping type=0x{frame[1]:02X} len={len(frame)}")
 
-            if declared > 256 or declared < 4:
-                # Invalid, drop byte
-                del self._buffer[0]
+    def _start_parser(self):
+        """Start the parse thread unless it is already running."""
+        if self._parse_thread is not None and self._parse_thread.is_alive():
+            return
+        # Fresh queue per thread, so a stop sentinel only reaches its own thread
+        self._frame_queue = queue.Queue(maxsize=self.FRAME_QUEUE_SIZE)
+        self._parse_thread = threading.Thread(
+            target=self._parse_loop, args=(self._frame_queue,),
+            name="raysid-parse", daemon=True)
+        self._parse_thread.start()
+
+    def _stop_parser(self):
+        """Ask the parse thread to flush what it has and exit."""
+        if self._parse_thread is not None and self._parse_thread.is_alive():
+            self._frame_queue.put(None)
+        self._parse_thread = None
+
+    def _parse_loop(self, frames: queue.Queue):
+        """Parse thread: drain frames, emit packets_received in batches.
+
+        The batch is emitted flush_interval_ms after its first packet;
+        the signal is queued to the GUI thread by Qt.
+        """
+        deadline = None
+        while True:
+            timeout = None
+            if deadline is not None:
+                timeout = deadline - time.monotonic()
+            try:
+                if timeout is not None and timeout <= 0:
+                    raise queue.Empty
+                frame = frames.get(timeout=timeout)
+            except queue.Empty:
+                self._flush_packets()
+                deadline = None
                 continue
 
-            if len(self._buffer) < declared:
-                # Wait for more data
-                break
-
-            frame = bytes(self._buffer[:declared])
-            del self._buffer[:declared]
-            self._parse_frame(frame)
+            if frame is None:
+                self._flush_packets()
+                return
+            try:
+                self._parse_frame(frame)
+            except Exception as e:
+                log_to_file(f"[PARSE] {type(e).__name__}: {e}")
+            if deadline is None and self._pending_packets:
+                deadline = time.monotonic() + self.flush_interval_ms / 1000.0
+
+    def _queue_packet(self, pkt: Dict):
+        """Queue a parsed packet for the next batched emit (parse thread)."""
+        self._pending_packets.append(pkt)
+
+    def _flush_packets(self):
+        """Emit all queued packets as one packets_received signal."""
+        if not self._pending_packets:
+            return
+        batch = self._pending_packets
+        self._pending_packets = []
+        self.packets_received.emit(batch)
 
     # ANSI colors for debug
     RED = "\033[91m"
@@ -333,14 +619,16 @@ class BleWorker(QObject):
             return
 
         ptype = frame[1]
-        log_to_file(f"[FRAME] type=0x{ptype:02X} len={len(frame)} raw={frame[:20].hex()}")
+        if DEBUG:
+            log_to_file(f"[FRAME] type=0x{ptype:02X} len={len(frame)} raw={frame[:20].hex()}")
 
         if ptype == 0x17:
             # CPS packet
             pkt = self._parse_cps(frame)
             if pkt:
-                log_to_file(f"[CPS ✓] cps={pkt.get('cps'):.2f} dose={pkt.get('dose_rate'):.3f}")
-                self.packet_received.emit(pkt)
+                if DEBUG:
+                    log_to_file(f"[CPS ✓] cps={pkt.get('cps'):.2f} dose={pkt.get('dose_rate'):.3f}")
+                self._queue_packet(pkt)
             else:
                 log_to_file("[CPS] parse returned None")
 
@@ -348,15 +636,17 @@ class BleWorker(QObject):
             # Battery/status packet
             pkt = self._parse_battery(frame)
             if pkt:
-                log_to_file(f"[BATT ✓] level={pkt.get('level')}% temp={pkt.get('temperature'):.1f}°C")
-                self.packet_received.emit(pkt)
+                if DEBUG:
+                    log_to_file(f"[BATT ✓] level={pkt.get('level')}% temp={pkt.get('temperature'):.1f}°C")
+                self._queue_packet(pkt)
 
         elif ptype in self.SPECTRUM_TYPES:
             # Spectrum packet
             pkt = self._parse_spectrum(frame)
             if pkt:
-                log_to_file(f"[SPEC ✓] type=0x{ptype:02X} bins={len(pkt.get('bins', {}))} last_ch={pkt.get('last_channel')}")
-                self.packet_received.emit(pkt)
+                if DEBUG:
+                    log_to_file(f"[SPEC ✓] type=0x{ptype:02X} bins={len(pkt['bins_arr'])} last_ch={pkt.get('last_channel')}")
+                self._queue_packet(pkt)
             else:
                 log_to_file(f"[SPEC ✗] type=0x{ptype:02X} len={len(frame)} REJECTED")
 
@@ -372,7 +662,8 @@ class BleWorker(QObject):
             log_to_file(f"[CPS ✗] checksum FAILED")
             return None
         
-        log_to_file(f"[CPS] checksum OK, parsing data...")
+        if DEBUG:
+            log_to_file(f"[CPS] checksum OK, parsing data...")
         
         # Overload check
         overload = 0
@@ -386,25 +677,26 @@ class BleWorker(QObject):
         dose_rate = None
         
         sets = 2 if len(frame) <= 20 else 12
-        log_to_file(f"[CPS] frame[0]={frame[0]} len={len(frame)} sets={sets}")
+        if DEBUG:
+            log_to_file(f"[CPS] frame[0]={frame[0]} len={len(frame)} sets={sets}")
         
         for k in range(sets):
             idx_type = k * 3 + 2
-            idx_val_lo = k * 3 + 3
-            idx_val_hi = k * 3 + 4
-            if idx_val_hi >= len(frame):
+            if idx_type + 2 >= len(frame):
                 break
             data_type = frame[idx_type] & 0xFF
-            raw_value = ((frame[idx_val_hi] & 0xFF) << 8) | (frame[idx_val_lo] & 0xFF)
+            raw_value, = _U16LE.unpack_from(frame, idx_type + 1)
             unpacked = self._unpack_value(raw_value)
             value = unpacked / 600.0
-            log_to_file(f"[CPS] k={k} data_type={data_type} raw={raw_value} unpacked={unpacked} value={value:.2f}")
+            if DEBUG:
+                log_to_file(f"[CPS] k={k} data_type={data_type} raw={raw_value} unpacked={unpacked} value={value:.2f}")
             if data_type == 0:
                 cps = value
             elif data_type == 1:
                 dose_rate = value / 100.0  # Additional /100 for µSv/h display
         
-        log_to_file(f"[CPS] FINAL: cps={cps} dose_rate={dose_rate}")
+        if DEBUG:
+            log_to_file(f"[CPS] FINAL: cps={cps} dose_rate={dose_rate}")
         
         return {
             "type": "cps",
@@ -412,22 +704,6 @@ class BleWorker(QObject):
             "dose_rate": dose_rate if dose_rate is not None else 0
         }
 
-    @staticmethod
-    def _checksum3(data: bytes) -> int:
-        """3-byte XOR checksum."""
-        out = 0
-        length = len(data)
-        for i in range(0, length, 3):
-            value = 0
-            if i < length:
-                value |= (data[i] & 0xFF) << 16
-            if i + 1 < length:
-                value |= (data[i + 1] & 0xFF) << 8
-            if i + 2 < length:
-                value |= data[i + 2] & 0xFF
-            out ^= value
-        return out & 0xFFFFFF
-
     def _validate_cps_checksum2b(self, packet: bytes) -> bool:
         """Validate CPS packet checksum (2-byte comparison)."""
         if len(packet) < 7:
@@ -438,24 +714,6 @@ class BleWorker(QObject):
         exp_2b = packet[-4:-2]
         return calc_2b == exp_2b
 
-    def _validate_checksum(self, packet: bytes) -> bool:
-        """Validate packet checksum (3-byte XOR)."""
-        if len(packet) < 7:
-            return False
-        # Calculate checksum over data (excluding last 3 bytes which are checksum + length)
-        calculated = self._checksum3(packet[1:-3])
-        calc_bytes = calculated.to_bytes(3, 'big')  # [high, mid, low]
-        
-        # Expected checksum is in packet[-4:-1] as [low, mid, high]
-        exp_low = packet[-4] & 0xFF
-        exp_mid = packet[-3] & 0xFF
-        exp_high = packet[-2] & 0xFF
-        
-        # Compare
-        return (calc_bytes[0] == exp_high and 
-                calc_bytes[1] == exp_mid and 
-                calc_bytes[2] == exp_low)
-
     @staticmethod
     def _unpack_value(v: int) -> int:
         """Unpack encoded value according to Raysid protocol."""
@@ -475,7 +733,7 @@ class BleWorker(QObject):
         # They are validated by packet structure only
         
         # Temperature: bytes[2-3] little-endian, /10.0 - 100.0
-        temp_raw = (frame[2] & 0xFF) | ((frame[3] & 0xFF) << 8)
+        temp_raw, = _U16LE.unpack_from(frame, 2)
         temperature = temp_raw / 10.0 - 100.0
         
         # Battery percent: byte[4]
@@ -511,14 +769,10 @@ class BleWorker(QObject):
         limit = length - 3  # exclude checksum bytes at end
         ptype = frame[1]
 
-        div = 1
-        if ptype == 0x31:
-            div = 3
-        elif ptype == 0x32:
-            div = 9
+        div, decode = _SPECTRUM_DECODERS[ptype]
 
         # Start channel: bytes[2],bytes[3] (little-endian, jak większość protokołu Raysid)
-        start_ch = frame[2] | (frame[3] << 8)
+        start_ch, = _U16LE.unpack_from(frame, 2)
         
         # Kafelki (tiles) mogą mieć start_ch w dowolnym miejscu spektrum.
         # 0x32 (div=9): ~200 kanałów kompresowanych → 0..1800 full-res
@@ -531,129 +785,24 @@ class BleWorker(QObject):
             return None
         
         # Initial value: bytes[6],bytes[5],bytes[4] (big-endian, 3 bytes)
-        cur_val = (frame[6] << 16) | (frame[5] << 8) | frame[4]
+        cur_val = int.from_bytes(frame[4:7], "little")
 
-        bins = {}
         # start_ch jest w jednostkach FULL-RES (0-1799), przeliczamy na kompresowane
         # Widget potem przemnoży przez div żeby uzyskać full-res
-        x = start_ch // div
+        start_x = start_ch // div
         # Limit w jednostkach kompresowanych
         max_channel = 1800 // div + 10  # Margines bezpieczeństwa
 
-        # First value - single channel, normalized by div
-        bins[x] = cur_val / float(div)
-        x += 1
-
-        pos = 7
-        frame_len = len(frame)
-        while pos < limit and pos < frame_len and x < max_channel:
-            b = frame[pos]
-
-            # Special case: bytes[pos]==0 means pointType=4, pointsAmount=1
-            if b == 0:
-                point_type = 4
-                points_amount = 1
-            else:
-                point_type = (b & 0xFF) // 64
-                points_amount = (b & 0xFF) % 64
-
-            pos += 1
-
-            if point_type == 0:
-                # 2 values in 1 byte (4-bit nibbles)
-                amount = 0
-                while amount < points_amount and pos < limit and pos < frame_len:
-                    bytev = frame[pos]
-                    # High nibble
-                    diff = (bytev & 0xFF) // 16
-                    if diff > 7:
-                        diff -= 16
-                    cur_val += diff
-                    bins[x] = cur_val / float(div)
-                    x += 1
-                    amount += 1
-
-                    if amount < points_amount:
-                        # Low nibble
-                        diff = (bytev & 0xFF) % 16
-                        if diff > 7:
-                            diff -= 16
-                        cur_val += diff
-                        bins[x] = cur_val / float(div)
-                        x += 1
-                        amount += 1
-
-                    pos += 1
-
-            elif point_type == 1:
-                # 1 value in 1 byte (signed 8-bit)
-                amount = 0
-                while amount < points_amount and pos < limit and pos < frame_len:
-                    diff = frame[pos] & 0xFF
-                    if diff > 127:
-                        diff -= 256
-                    cur_val += diff
-                    bins[x] = cur_val / float(div)
-                    x += 1
-                    amount += 1
-                    pos += 1
-
-            elif point_type == 2:
-                # 2 values in 3 bytes (12-bit each)
-                amount = 0
-                while amount < points_amount and pos + 1 < limit and pos + 1 < frame_len:
-                    b0 = frame[pos]
-                    b1 = frame[pos + 1]
-
-                    # First 12-bit value
-                    diff = ((b0 << 4) | ((b1 >> 4) & 0xF)) & 0xFFF
-                    if diff > 2047:
-                        diff -= 4096
-                    cur_val += diff
-                    bins[x] = cur_val / float(div)
-                    x += 1
-                    amount += 1
-                    pos += 2
-
-                    if amount < points_amount and pos < limit and pos < frame_len:
-                        b2 = frame[pos]
-                        # Second 12-bit value
-                        diff = ((b1 & 0xF) << 8) | (b2 & 0xFF)
-                        if diff > 2047:
-                            diff -= 4096
-                        cur_val += diff
-                        bins[x] = cur_val / float(div)
-                        x += 1
-                        amount += 1
-                        pos += 1
-
-            elif point_type == 3:
-                # 1 value in 2 bytes (signed 16-bit, little-endian)
-                amount = 0
-                while amount < points_amount and pos + 1 < limit and pos + 1 < frame_len:
-                    diff = ((frame[pos + 1] & 0xFF) << 8) | (frame[pos] & 0xFF)
-                    if diff > 32767:
-                        diff -= 65536
-                    cur_val += diff
-                    bins[x] = cur_val / float(div)
-                    x += 1
-                    amount += 1
-                    pos += 2
+        # Decoded channels are contiguous: start_x .. x-1
+        out = np.zeros(_spectrum_out_size(start_x, max_channel), dtype=np.float64)
+        data = np.frombuffer(frame, dtype=np.uint8) if HAS_NUMBA else frame
+        x = decode(data, start_x, cur_val, limit, max_channel, out)
 
-            elif point_type == 4:
-                # 1 value in 3 bytes (signed 24-bit, little-endian)
-                if pos + 2 < limit and pos + 2 < frame_len:
-                    diff = (frame[pos + 2] << 16) | (frame[pos + 1] << 8) | frame[pos]
-                    if diff > 8388607:
-                        diff -= 16777216
-                    cur_val += diff
-                    bins[x] = cur_val / float(div)
-                    x += 1
-                    pos += 3
-                else:
-                    break
-
-            else:
-                break
-
-        return {"type": "spectrum", "bins": bins, "last_channel": x, "div": div}
+        # bins_arr[i] is compressed channel start_x + i
+        return {
+            "type": "spectrum",
+            "bins_arr": out[start_x:x],
+            "start_x": start_x,
+            "last_channel": x,
+            "div": div,
+        }
@@ -2,10 +2,9 @@
 from __future__ import annotations
 
 from typing import Dict, List
-from collections import deque
 
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QFrame
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QFont
 
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
@@ -17,11 +16,20 @@ class CPSWidget(QWidget):
     """Widget displaying CPS (counts per second) and dose rate."""
 
     HISTORY_SIZE = 120  # seconds of history
+    REDRAW_INTERVAL_MS = 33  # cap plot redraws at ~30 Hz
 
     def __init__(self):
         super().__init__()
-        self.cps_history = deque(maxlen=self.HISTORY_SIZE)
-        self.dose_history = deque(maxlen=self.HISTORY_SIZE)
+        # Fixed-size history, newest sample last; only the last _n are valid
+        self._y = np.zeros(self.HISTORY_SIZE, dtype=np.float32)
+        self._x = np.arange(-self.HISTORY_SIZE + 1, 1)
+        self._n = 0
+
+        # Coalesces bursts of update_cps() calls into a single redraw
+        self._redraw_timer = QTimer(self)
+        self._redraw_timer.setSingleShot(True)
+        self._redraw_timer.setInterval(self.REDRAW_INTERVAL_MS)
+        self._redraw_timer.timeout.connect(self._do_redraw)
 
         self._init_ui()
 
@@ -62,7 +70,9 @@ class CPSWidget(QWidget):
         layout.addWidget(numbers_frame)
 
         # History plot
-        self.figure = Figure(figsize=(10, 3), dpi=100)
+        # Constrained layout runs as part of full draws only (resize, rescale,
+        # theme); blitted updates never trigger a layout pass
+        self.figure = Figure(figsize=(10, 3), dpi=100, layout="constrained")
         self.canvas = FigureCanvas(self.figure)
         layout.addWidget(self.canvas)
 
@@ -74,8 +84,11 @@ class CPSWidget(QWidget):
         self.ax.set_ylim(0, 100)
         self.ax.grid(True, alpha=0.3)
 
-        self.line, = self.ax.plot([], [], 'g-', linewidth=1)
-        self.figure.tight_layout()
+        # The line is blitted over a cached background instead of redrawing
+        # the whole figure; full draws only happen when the axes change.
+        self.line, = self.ax.plot([], [], 'g-', linewidth=1, animated=True)
+        self._bg = None
+        self.canvas.mpl_connect('draw_event', self._on_draw)
 
     def update_cps(self, pkt: Dict):
         """Update from a parsed CPS packet."""
@@ -85,8 +98,11 @@ class CPSWidget(QWidget):
         self.cps_label.setText(f"{cps:.0f}")
         self.dose_label.setText(f"{dose:.3f}")
 
-        self.cps_history.append(cps)
-        self._redraw()
+        self._y[:-1] = self._y[1:]
+        self._y[-1] = cps
+        self._n = min(self._n + 1, self.HISTORY_SIZE)
+        if not self._redraw_timer.isActive():
+            self._redraw_timer.start()
 
     def set_theme(self, theme: str):
         """Set the theme for the CPS plot ('light' or 'dark')."""
@@ -117,15 +133,29 @@ class CPSWidget(QWidget):
             self.ax.yaxis.label.set_color('black')
             self.ax.title.set_color('black')
         
-        self._redraw()
+        self._bg = None  # cached background has the old colors
+        self._do_redraw()
+
+    def _on_draw(self, event):
+        """Re-capture the background after a full draw and overlay the line."""
+        self._bg = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.ax.draw_artist(self.line)
 
-    def _redraw(self):
-        n = len(self.cps_history)
+    def _do_redraw(self):
+        n = self._n
         if n == 0:
             return
-        x = np.arange(-n + 1, 1)
-        y = np.array(self.cps_history)
-        self.line.set_data(x, y)
-        max_cps = max(y.max(), 10)
-        self.ax.set_ylim(0, max_cps * 1.1)
-        self.canvas.draw_idle()
+        y = self._y[-n:]
+        self.line.set_data(self._x[-n:], y)
+        want = float(max(y.max(), 10)) * 1.1
+        top = self.ax.get_ylim()[1]
+        # Rescale only when the history outgrows the axes or falls below half
+        # of them; otherwise just re-blit the line
+        if self._bg is None or not top * 0.5 <= want <= top:
+            # Axes changed: full redraw, _on_draw refreshes the background
+            self.ax.set_ylim(0, want)
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self._bg)
+        self.ax.draw_artist(self.line)
+        self.canvas.blit(self.ax.bbox)
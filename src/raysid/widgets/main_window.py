@@ -3,41 +3,212 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from typing import Optional, List, Dict
+import time
+from typing import Optional, Dict, Tuple
 
+import qasync
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLabel, QComboBox, QGroupBox, QStatusBar,
-    QTabWidget, QSplitter, QFrame, QMessageBox, QToolButton
+    QTabWidget, QSplitter, QFrame, QMessageBox, QToolButton, QApplication
 )
-from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QObject, QSettings
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QObject
 from PyQt5.QtGui import QIcon
 
 from raysid.widgets.spectrum_widget import SpectrumWidget
 from raysid.widgets.cps_widget import CPSWidget
-from raysid.widgets.settings_dialog import SettingsDialog, detect_system_theme
+from raysid.widgets.settings_dialog import (
+    SettingsDialog, app_settings, detect_system_theme, get_setting, set_setting
+)
 from raysid.ble_worker import BleWorker
 
 
+# Window stylesheets, built once; Qt reparses them on every setStyleSheet()
+_LIGHT_QSS = """
+QMainWindow, QWidget {
+    background-color: #ffffff;
+    color: #000000;
+}
+QGroupBox {
+    font-weight: bold;
+    border: 2px solid #cccccc;
+    border-radius: 5px;
+    margin-top: 1ex;
+}
+QGroupBox::title {
+    subcontrol-origin: margin;
+    left: 10px;
+    padding: 0 10px 0 10px;
+}
+QPushButton {
+    background-color: #f0f0f0;
+    border: 1px solid #cccccc;
+    padding: 5px 10px;
+    border-radius: 3px;
+}
+QPushButton:hover {
+    background-color: #e0e0e0;
+}
+QPushButton:pressed {
+    background-color: #d0d0d0;
+}
+QPushButton:disabled {
+    background-color: #f5f5f5;
+    color: #999999;
+}
+QComboBox {
+    background-color: white;
+    border: 1px solid #cccccc;
+    padding: 2px;
+}
+QComboBox::drop-down {
+    border: none;
+}
+QComboBox::down-arrow {
+    image: none;
+    border-left: 4px solid transparent;
+    border-right: 4px solid transparent;
+    border-top: 4px solid #666666;
+    margin-right: 5px;
+}
+QStatusBar {
+    background-color: #f0f0f0;
+    border-top: 1px solid #cccccc;
+}
+QTabWidget::pane {
+    border: 1px solid #cccccc;
+}
+QTabBar::tab {
+    background-color: #f0f0f0;
+    border: 1px solid #cccccc;
+    padding: 5px 10px;
+}
+QTabBar::tab:selected {
+    background-color: white;
+}
+"""
+
+_DARK_QSS = """
+QMainWindow, QWidget {
+    background-color: #2b2b2b;
+    color: #ffffff;
+}
+QGroupBox {
+    font-weight: bold;
+    border: 2px solid #555555;
+    border-radius: 5px;
+    margin-top: 1ex;
+    color: #ffffff;
+}
+QGroupBox::title {
+    subcontrol-origin: margin;
+    left: 10px;
+    padding: 0 10px 0 10px;
+    color: #ffffff;
+}
+QPushButton {
+    background-color: #404040;
+    border: 1px solid #666666;
+    padding: 5px 10px;
+    border-radius: 3px;
+    color: #ffffff;
+}
+QPushButton:hover {
+    background-color: #505050;
+}
+QPushButton:pressed {
+    background-color: #606060;
+}
+QPushButton:disabled {
+    background-color: #333333;
+    color: #888888;
+}
+QComboBox {
+    background-color: #404040;
+    border: 1px solid #666666;
+    padding: 2px;
+    color: #ffffff;
+}
+QComboBox::drop-down {
+    border: none;
+}
+QComboBox::down-arrow {
+    image: none;
+    border-left: 4px solid transparent;
+    border-right: 4px solid transparent;
+    border-top: 4px solid #cccccc;
+    margin-right: 5px;
+}
+QComboBox QAbstractItemView {
+    background-color: #404040;
+    color: #ffffff;
+    selection-background-color: #606060;
+}
+QStatusBar {
+    background-color: #404040;
+    border-top: 1px solid #666666;
+    color: #ffffff;
+}
+QTabWidget::pane {
+    border: 1px solid #666666;
+}
+QTabBar::tab {
+    background-color: #404040;
+    border: 1px solid #666666;
+    padding: 5px 10px;
+    color: #ffffff;
+}
+QTabBar::tab:selected {
+    background-color: #2b2b2b;
+}
+QLabel {
+    color: #ffffff;
+}
+"""
+
+
 class MainWindow(QMainWindow):
     """Main application window with tabs for Spectrum and CPS views."""
 
+    # Scan results are reused for this long (Shift+Scan forces a rescan)
+    SCAN_CACHE_TTL_S = 20.0
+    # Live scan length; devices show up in the combo as they advertise
+    SCAN_DURATION_S = 3.0
+    # Reconnect backoff: 5 s, 10 s, 20 s, ... capped
+    RECONNECT_BASE_DELAY_S = 5.0
+    RECONNECT_MAX_DELAY_S = 60.0
+
     def __init__(self, loop: asyncio.AbstractEventLoop):
         super().__init__()
         self.loop = loop
         self.logger = logging.getLogger("raysid.app")
-        logging.basicConfig(level=logging.DEBUG, format="%(asctime)s [%(levelname)s] %(message)s")
 
-        # QSettings for persistence
-        self.settings = QSettings("Raysid", "GammaSpectrometer")
+        # QSettings for persistence (shared, cached - see settings_dialog)
+        self.settings = app_settings()
 
         self.ble_worker: Optional[BleWorker] = None
         self.connected = False
-        self.scanned_devices: List[Dict] = []
-        self._reconnect_attempts = 0
+        self.scanned_devices: Dict[str, str] = {}  # address -> name
+        self._scan_cache: Optional[Tuple[float, Dict[str, str]]] = None  # (monotonic, devices)
         self._max_reconnect_attempts = 3
+        self._reconnect_task: Optional[asyncio.Task] = None
+        # Set before we disconnect on purpose: bleak reports that disconnect
+        # through the same callback as a lost link, and it must not reconnect
+        self._user_disconnect = False
+        self._ping_task: Optional[asyncio.Future] = None
+        # Disconnect scheduled by force_cleanup(); the exit path awaits it
+        self.disconnect_task: Optional[asyncio.Future] = None
+        self.batch_flush_ms = BleWorker.DEFAULT_FLUSH_MS
+        self._current_theme: Optional[str] = None
 
         self._init_ui()
+        # Packet type -> handler, looked up once per packet
+        self._packet_handlers = {
+            "cps": self._on_cps,
+            "battery": self._on_battery,
+            # Each tile is applied at once; the widget coalesces the redraws
+            "spectrum": self.spectrum_widget.update_spectrum,
+        }
         self._connect_signals()
         self.apply_theme()
 
@@ -64,6 +235,7 @@ class MainWindow(QMainWindow):
         conn_layout.addWidget(self.device_combo)
 
         self.scan_btn = QPushButton("Scan")
+        self.scan_btn.setToolTip("Scan for Raysid devices (Shift+click to force a fresh scan)")
         conn_layout.addWidget(self.scan_btn)
 
         self.connect_btn = QPushButton("Connect")
@@ -75,9 +247,11 @@ class MainWindow(QMainWindow):
 
         conn_layout.addStretch()
 
-        # Status labels
-        self.battery_label = QLabel("Battery: --")
-        self.temp_label = QLabel("Temp: --")
+        # Status labels (last text kept to skip no-op setText calls)
+        self._battery_text = "Battery: --"
+        self._temp_text = "Temp: --"
+        self.battery_label = QLabel(self._battery_text)
+        self.temp_label = QLabel(self._temp_text)
         conn_layout.addWidget(self.battery_label)
         conn_layout.addWidget(self.temp_label)
 
@@ -97,9 +271,11 @@ class MainWindow(QMainWindow):
         self.spectrum_widget = SpectrumWidget()
         self.tabs.addTab(self.spectrum_widget, "Spectrum")
 
-        # CPS tab
-        self.cps_widget = CPSWidget()
-        self.tabs.addTab(self.cps_widget, "CPS / Dose")
+        # CPS tab - a placeholder until first shown or first CPS packet,
+        # so its plot canvas is not built before the window appears
+        self.cps_widget: Optional[CPSWidget] = None
+        self._cps_placeholder = QWidget()
+        self.tabs.addTab(self._cps_placeholder, "CPS / Dose")
 
         layout.addWidget(self.tabs, stretch=1)
 
@@ -114,177 +290,285 @@ class MainWindow(QMainWindow):
         self.settings_btn.clicked.connect(self._on_settings)
         self.disconnect_btn.clicked.connect(self._on_disconnect)
         self.tabs.currentChanged.connect(self._on_tab_changed)
+        QApplication.instance().paletteChanged.connect(self._on_palette_changed)
 
     # --- Actions ---
 
-    def _on_scan(self):
+    @qasync.asyncSlot()
+    async def _on_scan(self):
+        force = bool(QApplication.keyboardModifiers() & Qt.ShiftModifier)
         self.status_bar.showMessage("Scanning for BLE devices...")
         self.scan_btn.setEnabled(False)
-        self.device_combo.clear()
-        asyncio.ensure_future(self._do_scan())
+        await self._do_scan(force=force)
 
-    async def _do_scan(self):
+    async def _do_scan(self, force: bool = False):
         try:
-            from bleak import BleakScanner
-            devices = await BleakScanner.discover(timeout=5.0)
-            raysid_devs = [
-                {"name": d.name or "Unknown", "address": d.address}
-                for d in devices if d.name and "Raysid" in d.name
-            ]
-            self.scanned_devices = raysid_devs
-            for dev in raysid_devs:
-                self.device_combo.addItem(f"{dev['name']} ({dev['address']})", dev['address'])
-            # Auto-select first Raysid device
-            if raysid_devs:
-                self.device_combo.setCurrentIndex(0)
-            self.status_bar.showMessage(f"Found {len(raysid_devs)} Raysid device(s)")
+            cache = self._scan_cache
+            if not force and cache is not None and time.monotonic() - cache[0] < self.SCAN_CACHE_TTL_S:
+                devices = cache[1]
+                for address, name in devices.items():
+                    self._add_scanned_device(name, address)
+            else:
+                devices = await self._scan_live()
+                self._scan_cache = (time.monotonic(), devices)
+            self._drop_unscanned_devices(devices.keys())
+            self.scanned_devices = devices
+            self.status_bar.showMessage(f"Found {len(devices)} Raysid device(s)")
         except Exception as e:
             self.status_bar.showMessage(f"Scan failed: {e}")
         finally:
             self.scan_btn.setEnabled(True)
 
+    async def _scan_live(self) -> Dict[str, str]:
+        """Scan for SCAN_DURATION_S, adding each Raysid device as it advertises.
+
+        Returns address -> name, in discovery order.
+        """
+        from bleak import BleakScanner
+
+        found: Dict[str, str] = {}
+
+        # Runs on the asyncio loop, which is the Qt thread under qasync
+        def on_advert(device, adv_data):
+            address = device.address
+            if address in found:
+                return
+            name = device.name or adv_data.local_name
+            if not name or "Raysid" not in name:
+                return
+            found[address] = name
+            self._add_scanned_device(name, address)
+            self.status_bar.showMessage(f"Scanning... found {len(found)} Raysid device(s)")
+
+        async with BleakScanner(detection_callback=on_advert):
+            await asyncio.sleep(self.SCAN_DURATION_S)
+        return found
+
+    def _add_scanned_device(self, name: str, address: str):
+        """Add a device to the combo unless listed already.
+
+        The combo is updated in place across scans (no clear()), so the
+        selection survives a rescan while the device is still around.
+        """
+        combo = self.device_combo
+        if combo.findData(address) >= 0:
+            return
+        combo.addItem(f"{name} ({address})", address)
+        # Auto-select first Raysid device
+        if combo.currentIndex() < 0:
+            combo.setCurrentIndex(combo.count() - 1)
+
+    def _drop_unscanned_devices(self, addresses):
+        for i in reversed(range(self.device_combo.count())):
+            if self.device_combo.itemData(i) not in addresses:
+                self.device_combo.removeItem(i)
+
     def _on_connect(self):
         addr = self.device_combo.currentData()
         if not addr:
             QMessageBox.warning(self, "No device", "Please scan and select a device first.")
             return
 
+        self._cancel_reconnect()
+        self._user_disconnect = False
         self.status_bar.showMessage(f"Connecting to {addr}...")
         self.connect_btn.setEnabled(False)
 
-        self.ble_worker = BleWorker(addr, self.loop)
-        self.ble_worker.packet_received.connect(self._on_packet)
+        self.ble_worker = BleWorker(addr, self.loop, flush_interval_ms=self.batch_flush_ms)
+        self.ble_worker.packets_received.connect(self._on_packets)
         self.ble_worker.connection_lost.connect(self._on_connection_lost)
 
-        asyncio.ensure_future(self._do_connect())
+        # _on_connect itself stays synchronous: the QMessageBox above runs a
+        # nested event loop, which must not happen inside an asyncio task
+        self._do_connect()
 
+    @qasync.asyncSlot()
     async def _do_connect(self):
         try:
             await self.ble_worker.connect()
-            self.connected = True
-            self.status_bar.showMessage("Connected!")
-            self.connect_btn.setEnabled(False)
-            self.disconnect_btn.setEnabled(True)
-            self.scan_btn.setEnabled(False)
-            # Start ping timer
-            self.ping_timer.start(self.ping_interval_ms)
-            # Send initial ping for current tab
-            self._send_ping()
+            self._on_connected("Connected!")
         except Exception as e:
             self.status_bar.showMessage(f"Connection failed: {e}")
             self.connect_btn.setEnabled(True)
 
-    def _on_disconnect(self):
+    def _on_connected(self, message: str):
+        self.connected = True
+        self.status_bar.showMessage(message)
+        self.connect_btn.setEnabled(False)
+        self.disconnect_btn.setEnabled(True)
+        self.scan_btn.setEnabled(False)
+        # Start ping timer
+        self.ping_timer.start(self.ping_interval_ms)
+        # Send initial ping for current tab
+        self._send_ping()
+
+    @qasync.asyncSlot()
+    async def _on_disconnect(self):
+        self._user_disconnect = True
+        self._cancel_reconnect()
         self.ping_timer.stop()
-        if self.ble_worker:
-            asyncio.ensure_future(self.ble_worker.disconnect())
         self._reset_ui()
         self.status_bar.showMessage("Disconnected")
+        if self.ble_worker:
+            try:
+                await self.ble_worker.disconnect()
+            except Exception as e:
+                self.logger.warning(f"Disconnect error: {e}")
 
     def _on_connection_lost(self):
         self.ping_timer.stop()
+        self._scan_cache = None  # the device list may be stale now
         self._reset_ui()
-        self._reconnect_attempts = 0
-        self._max_reconnect_attempts = 3
-        self.status_bar.showMessage("Connection lost - will try reconnect in 10s...")
-        # Wait longer to let BlueZ clean up properly
-        QTimer.singleShot(10000, self._attempt_reconnect)
-    
-    def _attempt_reconnect(self):
-        """Attempt to reconnect to the last device."""
-        if self.connected:
-            return  # Already reconnected
-        if not self.ble_worker or not self.ble_worker.device_address:
+        self._cancel_reconnect()
+        if self._user_disconnect:
+            return
+        self._reconnect_task = asyncio.ensure_future(self._reconnect_loop())
+
+    def _cancel_reconnect(self):
+        if self._reconnect_task is not None and not self._reconnect_task.done():
+            self._reconnect_task.cancel()
+        self._reconnect_task = None
+
+    async def _reconnect_loop(self):
+        """Reconnect to the last device with exponential backoff."""
+        worker = self.ble_worker
+        if not worker or not worker.device_address:
             self.status_bar.showMessage("Cannot reconnect - no device address")
             return
-        
-        self._reconnect_attempts += 1
-        if self._reconnect_attempts > self._max_reconnect_attempts:
-            self.status_bar.showMessage(f"Reconnect failed after {self._max_reconnect_attempts} attempts. Please reconnect manually.")
+
+        for attempt in range(1, self._max_reconnect_attempts + 1):
+            # Gives BlueZ time to clean up; doubles after each failure
+            delay = min(self.RECONNECT_MAX_DELAY_S, self.RECONNECT_BASE_DELAY_S * 2 ** (attempt - 1))
+            self.status_bar.showMessage(
+                f"Connection lost - reconnecting in {delay:.0f}s ({attempt}/{self._max_reconnect_attempts})...")
+            await asyncio.sleep(delay)
+            if self.connected:
+                return  # Already reconnected
+
+            self.status_bar.showMessage(f"Reconnecting ({attempt}/{self._max_reconnect_attempts})...")
+            try:
+                await worker.connect()
+            except Exception as e:
+                self.logger.warning(f"Reconnect attempt {attempt} failed: {e}")
+                continue
+            self._on_connected("Reconnected!")
             return
-        
-        self.status_bar.showMessage(f"Reconnecting ({self._reconnect_attempts}/{self._max_reconnect_attempts})...")
-        asyncio.ensure_future(self._do_reconnect())
-    
-    async def _do_reconnect(self):
-        """Perform the actual reconnection."""
-        try:
-            # Wait a bit before reconnecting to let BlueZ clean up
-            await asyncio.sleep(2)
-            
-            await self.ble_worker.connect(self.ble_worker.device_address)
-            self.connected = True
-            self._reconnect_attempts = 0
-            self.status_bar.showMessage("Reconnected!")
-            self.connect_btn.setEnabled(False)
-            self.disconnect_btn.setEnabled(True)
-            self.scan_btn.setEnabled(False)
-            self.ping_timer.start(self.ping_interval_ms)
-            self._send_ping()
-        except Exception as e:
-            self.logger.warning(f"Reconnect attempt {self._reconnect_attempts} failed: {e}")
-            self.status_bar.showMessage(f"Reconnect failed - retrying in 15s...")
-            QTimer.singleShot(15000, self._attempt_reconnect)
+
+        self.status_bar.showMessage(
+            f"Reconnect failed after {self._max_reconnect_attempts} attempts. Please reconnect manually.")
 
     def _reset_ui(self):
         self.connected = False
         self.connect_btn.setEnabled(True)
         self.disconnect_btn.setEnabled(False)
         self.scan_btn.setEnabled(True)
-        self.battery_label.setText("Battery: --")
-        self.temp_label.setText("Temp: --")
+        self._battery_text = "Battery: --"
+        self._temp_text = "Temp: --"
+        self.battery_label.setText(self._battery_text)
+        self.temp_label.setText(self._temp_text)
 
     def _on_settings(self):
         """Open settings dialog."""
         dialog = SettingsDialog(self)
         if dialog.exec_():
-            # Apply settings to spectrum widget
-            self.spectrum_widget.set_peak_sensitivity(dialog.get_peak_sensitivity())
-            self.spectrum_widget.set_smooth_window(dialog.get_smooth_window())
-            self.spectrum_widget._redraw()
+            # Apply settings to spectrum widget; redraw only if one changed
+            changed = self.spectrum_widget.set_peak_sensitivity(dialog.get_peak_sensitivity())
+            changed |= self.spectrum_widget.set_smooth_window(dialog.get_smooth_window())
+            if changed:
+                self.spectrum_widget.schedule_redraw()
             
             # Apply theme
             self.apply_theme(dialog.get_theme())
 
+    def _ensure_cps_widget(self) -> CPSWidget:
+        """Create the CPS tab's widget on first use, swapping out the placeholder."""
+        if self.cps_widget is None:
+            self.cps_widget = CPSWidget()
+            if self._current_theme is not None:
+                self.cps_widget.set_theme(self._current_theme)
+            index = self.tabs.indexOf(self._cps_placeholder)
+            current = self.tabs.currentIndex()
+            # Swapping the page must not look like a tab change (PING)
+            self.tabs.blockSignals(True)
+            self.tabs.removeTab(index)
+            self.tabs.insertTab(index, self.cps_widget, "CPS / Dose")
+            self.tabs.setCurrentIndex(current)
+            self.tabs.blockSignals(False)
+            self._cps_placeholder.deleteLater()
+            self._cps_placeholder = None
+            self._packet_handlers["cps"] = self.cps_widget.update_cps
+        return self.cps_widget
+
     def _on_tab_changed(self, index: int):
+        if self.tabs.widget(index) is self._cps_placeholder:
+            self._ensure_cps_widget()
         # Send ping with appropriate tab value
         self._send_ping()
 
     def _send_ping(self):
         if not self.connected or not self.ble_worker:
             return
+        # One PING in flight at most; a slow BLE write skips ticks instead
+        # of piling up tasks
+        if self._ping_task is not None and not self._ping_task.done():
+            return
         # tab=1 for spectrum, tab=0 for CPS
         tab = 1 if self.tabs.currentIndex() == 0 else 0
-        asyncio.ensure_future(self.ble_worker.send_ping(tab))
-        self.logger.debug(f"Sent PING tab={tab}")
-
-    def _on_packet(self, pkt: dict):
-        ptype = pkt.get("type")
-        if ptype == "cps":
-            self.cps_widget.update_cps(pkt)
-        elif ptype == "battery":
-            self.battery_label.setText(f"Battery: {pkt.get('level', '--')}%")
-            temp = pkt.get('temperature')
-            if temp is not None:
-                self.temp_label.setText(f"Temp: {temp:.1f}°C")
-        elif ptype == "spectrum":
-            self.spectrum_widget.update_spectrum(pkt)
+        self._ping_task = asyncio.ensure_future(self.ble_worker.send_ping(tab))
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"Sent PING tab={tab}")
+
+    def set_batch_flush_interval_ms(self, ms: int):
+        """Set how often the BLE worker flushes batched packets to the GUI."""
+        self.batch_flush_ms = max(0, int(ms))
+        if self.ble_worker:
+            self.ble_worker.flush_interval_ms = self.batch_flush_ms
+
+    def _on_packets(self, pkts: list):
+        handlers = self._packet_handlers
+        for pkt in pkts:
+            handler = handlers.get(pkt.get("type"))
+            if handler is not None:
+                handler(pkt)
+
+    def _on_cps(self, pkt: dict):
+        # Only until the CPS widget exists; then the table calls it directly
+        self._ensure_cps_widget().update_cps(pkt)
+
+    def _on_battery(self, pkt: dict):
+        # setText re-lays out the connection bar; skip it when nothing changed
+        text = f"Battery: {pkt.get('level', '--')}%"
+        if text != self._battery_text:
+            self._battery_text = text
+            self.battery_label.setText(text)
+        temp = pkt.get('temperature')
+        if temp is not None:
+            text = f"Temp: {temp:.1f}°C"
+            if text != self._temp_text:
+                self._temp_text = text
+                self.temp_label.setText(text)
 
     def force_cleanup(self):
-        """Force synchronous cleanup of BLE connection."""
+        """Stop BLE activity without blocking and schedule the disconnect.
+
+        Safe to call from a signal handler while the loop is running. The
+        task is kept in disconnect_task; the exit path in raysid.__main__
+        awaits it (up to 2 s) before cancelling whatever else is pending.
+        """
         self.ping_timer.stop()
+        self._user_disconnect = True
+        self._cancel_reconnect()
         self.connected = False
-        if self.ble_worker and self.ble_worker.client:
-            try:
-                # Try synchronous disconnect
-                if self.ble_worker.client.is_connected:
-                    future = asyncio.ensure_future(self.ble_worker.disconnect())
-                    # Give it a short time to complete
-                    self.loop.run_until_complete(asyncio.wait_for(future, timeout=2.0))
-            except Exception as e:
-                self.logger.warning(f"Cleanup disconnect error: {e}")
-            finally:
-                self.ble_worker = None
+        worker = self.ble_worker
+        if worker and worker.client and worker.client.is_connected:
+            if self.disconnect_task is None or self.disconnect_task.done():
+                self.disconnect_task = asyncio.ensure_future(worker.disconnect())
+
+    def _on_palette_changed(self, _palette):
+        # The system theme may have switched; detect_system_theme() caches
+        detect_system_theme.cache_clear()
+        if get_setting("ui/theme", "system", str) == "system":
+            self.apply_theme()
 
     def apply_theme(self, theme: Optional[str] = None):
         """Apply the selected theme to the application.
@@ -295,16 +579,20 @@ class MainWindow(QMainWindow):
         """
         if theme is not None:
             # Save the new theme to settings
-            self.settings.setValue("ui/theme", theme)
-            self.settings.sync()
+            set_setting("ui/theme", theme)
             theme_setting = theme
         else:
-            theme_setting = self.settings.value("ui/theme", "system", type=str)
+            theme_setting = get_setting("ui/theme", "system", str)
         
         if theme_setting == "system":
             actual_theme = detect_system_theme()
         else:
             actual_theme = theme_setting
+
+        # Restyling re-polishes every child widget and redraws both plots
+        if actual_theme == self._current_theme:
+            return
+        self._current_theme = actual_theme
         
         if actual_theme == "dark":
             self._apply_dark_theme()
@@ -313,170 +601,38 @@ class MainWindow(QMainWindow):
         
         # Update spectrum widget theme
         self.spectrum_widget.set_theme(actual_theme)
-        # Update CPS widget theme  
-        self.cps_widget.set_theme(actual_theme)
+        # Update CPS widget theme (applied on creation if not built yet)
+        if self.cps_widget is not None:
+            self.cps_widget.set_theme(actual_theme)
 
     def _apply_light_theme(self):
         """Apply light theme styles."""
-        self.setStyleSheet("""
-            QMainWindow, QWidget {
-                background-color: #ffffff;
-                color: #000000;
-            }
-            QGroupBox {
-                font-weight: bold;
-                border: 2px solid #cccccc;
-                border-radius: 5px;
-                margin-top: 1ex;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                left: 10px;
-                padding: 0 10px 0 10px;
-            }
-            QPushButton {
-                background-color: #f0f0f0;
-                border: 1px solid #cccccc;
-                padding: 5px 10px;
-                border-radius: 3px;
-            }
-            QPushButton:hover {
-                background-color: #e0e0e0;
-            }
-            QPushButton:pressed {
-                background-color: #d0d0d0;
-            }
-            QPushButton:disabled {
-                background-color: #f5f5f5;
-                color: #999999;
-            }
-            QComboBox {
-                background-color: white;
-                border: 1px solid #cccccc;
-                padding: 2px;
-            }
-            QComboBox::drop-down {
-                border: none;
-            }
-            QComboBox::down-arrow {
-                image: none;
-                border-left: 4px solid transparent;
-                border-right: 4px solid transparent;
-                border-top: 4px solid #666666;
-                margin-right: 5px;
-            }
-            QStatusBar {
-                background-color: #f0f0f0;
-                border-top: 1px solid #cccccc;
-            }
-            QTabWidget::pane {
-                border: 1px solid #cccccc;
-            }
-            QTabBar::tab {
-                background-color: #f0f0f0;
-                border: 1px solid #cccccc;
-                padding: 5px 10px;
-            }
-            QTabBar::tab:selected {
-                background-color: white;
-            }
-        """)
+        self.setStyleSheet(_LIGHT_QSS)
 
     def _apply_dark_theme(self):
         """Apply dark theme styles."""
-        self.setStyleSheet("""
-            QMainWindow, QWidget {
-                background-color: #2b2b2b;
-                color: #ffffff;
-            }
-            QGroupBox {
-                font-weight: bold;
-                border: 2px solid #555555;
-                border-radius: 5px;
-                margin-top: 1ex;
-                color: #ffffff;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                left: 10px;
-                padding: 0 10px 0 10px;
-                color: #ffffff;
-            }
-            QPushButton {
-                background-color: #404040;
-                border: 1px solid #666666;
-                padding: 5px 10px;
-                border-radius: 3px;
-                color: #ffffff;
-            }
-            QPushButton:hover {
-                background-color: #505050;
-            }
-            QPushButton:pressed {
-                background-color: #606060;
-            }
-            QPushButton:disabled {
-                background-color: #333333;
-                color: #888888;
-            }
-            QComboBox {
-                background-color: #404040;
-                border: 1px solid #666666;
-                padding: 2px;
-                color: #ffffff;
-            }
-            QComboBox::drop-down {
-                border: none;
-            }
-            QComboBox::down-arrow {
-                image: none;
-                border-left: 4px solid transparent;
-                border-right: 4px solid transparent;
-                border-top: 4px solid #cccccc;
-                margin-right: 5px;
-            }
-            QComboBox QAbstractItemView {
-                background-color: #404040;
-                color: #ffffff;
-                selection-background-color: #606060;
-            }
-            QStatusBar {
-                background-color: #404040;
-                border-top: 1px solid #666666;
-                color: #ffffff;
-            }
-            QTabWidget::pane {
-                border: 1px solid #666666;
-            }
-            QTabBar::tab {
-                background-color: #404040;
-                border: 1px solid #666666;
-                padding: 5px 10px;
-                color: #ffffff;
-            }
-            QTabBar::tab:selected {
-                background-color: #2b2b2b;
-            }
-            QLabel {
-                color: #ffffff;
-            }
-        """)
-
-    def closeEvent(self, event):
-        """Handle window close - ensure BLE is properly disconnected."""
+        self.setStyleSheet(_DARK_QSS)
+
+    @qasync.asyncClose
+    async def closeEvent(self, event):
+        """Handle window close - ensure BLE is properly disconnected.
+
+        asyncClose keeps Qt's close sequence waiting on this coroutine, so
+        the disconnect runs on the live loop instead of a nested one.
+        """
         self.ping_timer.stop()
+        self._user_disconnect = True
+        self._cancel_reconnect()
         self.connected = False
-        
-        if self.ble_worker:
+
+        worker = self.ble_worker
+        if worker and worker.client and worker.client.is_connected:
             try:
-                # Schedule disconnect and wait briefly
-                if self.ble_worker.client and self.ble_worker.client.is_connected:
-                    future = asyncio.ensure_future(self.ble_worker.disconnect())
-                    # Use QTimer to delay actual close until disconnect completes
-                    self.loop.run_until_complete(asyncio.wait_for(future, timeout=2.0))
+                await asyncio.wait_for(worker.disconnect(), timeout=2.0)
             except Exception as e:
                 self.logger.warning(f"Close disconnect error: {e}")
-            finally:
-                self.ble_worker = None
-        
+        self.ble_worker = None
+
+        # Persist anything Qt has not flushed yet
+        self.settings.sync()
         event.accept()
@@ -4,31 +4,88 @@ from __future__ import annotations
 import os
 import subprocess
 import sys
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QFormLayout,
     QLabel, QSlider, QPushButton, QGroupBox, QMessageBox, QComboBox
 )
 from PyQt5.QtCore import Qt, QSettings
 
+try:
+    import winreg
+    HAS_WINREG = True
+except ImportError:
+    HAS_WINREG = False
+
+
+# One QSettings for the whole app, plus a read cache in front of it
+_settings: Optional[QSettings] = None
+_settings_cache: Dict[str, Any] = {}
+_MISSING = object()
+
+
+def app_settings() -> QSettings:
+    """Return the shared QSettings instance."""
+    global _settings
+    if _settings is None:
+        _settings = QSettings("Raysid", "GammaSpectrometer")
+    return _settings
+
+
+def get_setting(key: str, default: Any, type_: type = str) -> Any:
+    """Read a setting; only the first read of each key hits the backing store."""
+    try:
+        return _settings_cache[key]
+    except KeyError:
+        value = app_settings().value(key, default, type=type_)
+        _settings_cache[key] = value
+        return value
+
 
+def set_setting(key: str, value: Any) -> None:
+    """Write a setting if it changed.
+
+    No explicit sync(): Qt flushes pending changes from the event loop
+    (and on exit), so the registry/ini file is not rewritten per call.
+    """
+    if _settings_cache.get(key, _MISSING) == value:
+        return
+    _settings_cache[key] = value
+    app_settings().setValue(key, value)
+
+
+@lru_cache(maxsize=1)
 def detect_system_theme() -> str:
-    """Detect system theme preference. Returns 'light' or 'dark'."""
+    """Detect system theme preference. Returns 'light' or 'dark'.
+
+    The result is cached; call detect_system_theme.cache_clear() when the
+    system palette changes.
+    """
     try:
         if sys.platform == "darwin":  # macOS
+            # pyobjc is only imported here, so other platforms never pay for it
+            try:
+                from Foundation import NSUserDefaults
+            except ImportError:
+                pass
+            else:
+                style = NSUserDefaults.standardUserDefaults().stringForKey_("AppleInterfaceStyle")
+                return "dark" if style else "light"
             result = subprocess.run(
                 ["defaults", "read", "-g", "AppleInterfaceStyle"],
                 capture_output=True, text=True, timeout=5
             )
             return "dark" if result.returncode == 0 else "light"
         
-        elif sys.platform == "win32":  # Windows
-            result = subprocess.run(
-                ["reg", "query", "HKCU\\SOFTWARE\\Microsoft\\Windows\\CurrentVersion\\Themes\\Personalize", "/v", "AppsUseLightTheme"],
-                capture_output=True, text=True, timeout=5
-            )
-            if result.returncode == 0 and "0x0" in result.stdout:
-                return "dark"
-            return "light"
+        elif sys.platform == "win32" and HAS_WINREG:  # Windows
+            with winreg.OpenKey(
+                winreg.HKEY_CURRENT_USER,
+                r"Software\Microsoft\Windows\CurrentVersion\Themes\Personalize",
+            ) as key:
+                value, _ = winreg.QueryValueEx(key, "AppsUseLightTheme")
+            return "dark" if value == 0 else "light"
         
         else:  # Linux and others
             # Check common environment variables
@@ -47,7 +104,6 @@ class SettingsDialog(QDialog):
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.settings = QSettings("Raysid", "GammaSpectrometer")
         self._init_ui()
         self._load_settings()
 
@@ -72,12 +128,11 @@ class SettingsDialog(QDialog):
         peak_group = QGroupBox("Peak Detection")
         peak_layout = QFormLayout(peak_group)
 
-        # Sensitivity slider (1-100, higher = more sensitive)
+        # Sensitivity slider (1-100, higher = more sensitive). No tick marks:
+        # they are repainted on every drag step, and the label shows the value
         self.sensitivity_slider = QSlider(Qt.Horizontal)
         self.sensitivity_slider.setRange(1, 100)
         self.sensitivity_slider.setValue(50)
-        self.sensitivity_slider.setTickPosition(QSlider.TicksBelow)
-        self.sensitivity_slider.setTickInterval(10)
         self.sensitivity_label = QLabel("50%")
         self.sensitivity_slider.valueChanged.connect(
             lambda v: self.sensitivity_label.setText(f"{v}%")
@@ -99,8 +154,6 @@ class SettingsDialog(QDialog):
         self.smooth_slider.setRange(5, 51)
         self.smooth_slider.setValue(21)
         self.smooth_slider.setSingleStep(2)
-        self.smooth_slider.setTickPosition(QSlider.TicksBelow)
-        self.smooth_slider.setTickInterval(10)
         self.smooth_label = QLabel("21")
         self.smooth_slider.valueChanged.connect(self._on_smooth_changed)
         
@@ -136,9 +189,9 @@ class SettingsDialog(QDialog):
 
     def _load_settings(self):
         """Load settings from QSettings."""
-        sensitivity = self.settings.value("peak/sensitivity", 50, type=int)
-        smooth_window = self.settings.value("smooth/window", 21, type=int)
-        theme = self.settings.value("ui/theme", "system", type=str)
+        sensitivity = get_setting("peak/sensitivity", 50, int)
+        smooth_window = get_setting("smooth/window", 21, int)
+        theme = get_setting("ui/theme", "system", str)
 
         self.sensitivity_slider.setValue(sensitivity)
         self.smooth_slider.setValue(smooth_window)
@@ -152,10 +205,9 @@ class SettingsDialog(QDialog):
 
     def _save_and_close(self):
         """Save settings and close dialog."""
-        self.settings.setValue("peak/sensitivity", self.sensitivity_slider.value())
-        self.settings.setValue("smooth/window", self.smooth_slider.value())
-        self.settings.setValue("ui/theme", self.theme_combo.currentData())
-        self.settings.sync()
+        set_setting("peak/sensitivity", self.sensitivity_slider.value())
+        set_setting("smooth/window", self.smooth_slider.value())
+        set_setting("ui/theme", self.theme_combo.currentData())
         self.accept()
 
     def get_peak_sensitivity(self) -> int:
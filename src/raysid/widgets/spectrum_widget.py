@@ -1,22 +1,43 @@
 """Spectrum visualization widget with matplotlib."""
 from __future__ import annotations
 
-from typing import Dict, List
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QCheckBox
-from PyQt5.QtCore import Qt, QSettings
+from PyQt5.QtCore import Qt, QTimer
 
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 import numpy as np
 
+from raysid.widgets.settings_dialog import get_setting, set_setting
+
 try:
-    from scipy.signal import find_peaks, savgol_filter
+    from scipy.signal import find_peaks, savgol_coeffs
     HAS_SCIPY = True
 except ImportError:
     HAS_SCIPY = False
 
 
+@lru_cache(maxsize=8)
+def _sg_kernels(window: int, polyorder: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+    """Savitzky-Golay FIR kernel plus the edge-fit matrix for a window size.
+
+    Row i of the edge matrix evaluates the window's least-squares polynomial
+    at position i, which is what savgol_filter's default 'interp' mode does
+    for the first and last window // 2 samples. Both are float32, like the
+    spectrum.
+    """
+    coeffs = savgol_coeffs(window, polyorder).astype(np.float32)
+    edges = np.array(
+        [savgol_coeffs(window, polyorder, pos=i, use="dot") for i in range(window)],
+        dtype=np.float32,
+    )
+    return coeffs, edges
+
+
 class SpectrumWidget(QWidget):
     """Widget displaying the gamma spectrum plot."""
 
@@ -27,17 +48,53 @@ class SpectrumWidget(QWidget):
     CHANNELS = 1800  # Max channels (for 0x30)
     KEV_PER_CHANNEL_BASE = 4.01  # For div=9 (0x32)
     MAX_KEV = 1000  # Display range: 0-1000 keV
+    REDRAW_INTERVAL_MS = 50  # cap plot redraws at ~20 Hz
+    # Tiles arriving closer than this count as streaming: the plot is drawn
+    # at half resolution without peak search until the stream goes quiet
+    STREAM_SETTLE_MS = 200
+    # ...but never for longer than this; a steady stream still gets a full
+    # redraw (with peaks) this often
+    MAX_PREVIEW_MS = 1000
 
     def __init__(self):
         super().__init__()
-        self.spectrum = np.zeros(self.CHANNELS, dtype=np.float64)
-        self.filled_channels = set()
-        self.peak_annotations = []
+        # Values are decoded counts divided by div (fractional for div 3/9).
+        # float32 keeps ~1e-7 relative precision, far below what the plot can
+        # resolve, at half the memory traffic of float64 on the smoothing/peak path
+        self.spectrum = np.zeros(self.CHANNELS, dtype=np.float32)
+        # Full-res channels that have received data at least once
+        self.filled_mask = np.zeros(self.CHANNELS, dtype=bool)
+        self._filled_count = 0  # == np.count_nonzero(filled_mask)
+        # The calibration is fixed (the spectrum is always full resolution),
+        # so the energy axis and the displayed channel range are constant
+        self._kev_per_ch = self._get_kev_per_channel()
+        self.x_vals = np.arange(self.CHANNELS, dtype=np.float32) * self._kev_per_ch
+        self._max_ch = min(int(self.MAX_KEV / self._kev_per_ch), self.CHANNELS)
+        # Peak labels are reused between redraws; the first _ann_shown are visible
+        self._ann_pool = []
+        self._ann_shown = 0
+        # Bumped whenever self.spectrum changes; keys the caches below so
+        # redraws without new data (theme, checkboxes) skip the heavy work
+        self._spectrum_version = 0
+        self._smooth_cache = (None, None)  # (key, smoothed)
+        self._peaks_cache = (None, [])  # (key, peaks)
         
         # Configurable settings
-        self.settings = QSettings("Raysid", "GammaSpectrometer")
-        self.peak_sensitivity = self.settings.value("peak/sensitivity", 50, type=int)
-        self.smooth_window = self.settings.value("smooth/window", 21, type=int)
+        self.peak_sensitivity = get_setting("peak/sensitivity", 50, int)
+        self.smooth_window = get_setting("smooth/window", 21, int)
+
+        # Coalesces bursts of update_spectrum() calls into a single redraw
+        self._redraw_timer = QTimer(self)
+        self._redraw_timer.setSingleShot(True)
+        self._redraw_timer.setInterval(self.REDRAW_INTERVAL_MS)
+        self._redraw_timer.timeout.connect(self._redraw)
+        # Restarted by every tile; when it fires the full-resolution plot
+        # (with peaks) is drawn
+        self._settle_timer = QTimer(self)
+        self._settle_timer.setSingleShot(True)
+        self._settle_timer.setInterval(self.STREAM_SETTLE_MS)
+        self._settle_timer.timeout.connect(self._redraw)
+        self._last_full_redraw = 0.0  # time.monotonic()
 
         self._init_ui()
 
@@ -53,13 +110,13 @@ class SpectrumWidget(QWidget):
         # Peak detection checkbox
         self.peak_checkbox = QCheckBox("Detect Peaks")
         self.peak_checkbox.setChecked(True)
-        self.peak_checkbox.stateChanged.connect(self._redraw)
+        self.peak_checkbox.stateChanged.connect(self.schedule_redraw)
         toolbar.addWidget(self.peak_checkbox)
         
         # Smoothing checkbox
         self.smooth_checkbox = QCheckBox("Smooth")
         self.smooth_checkbox.setChecked(False)
-        self.smooth_checkbox.stateChanged.connect(self._redraw)
+        self.smooth_checkbox.stateChanged.connect(self.schedule_redraw)
         toolbar.addWidget(self.smooth_checkbox)
 
         self.status_label = QLabel(f"Channels: 0 / {self.CHANNELS}")
@@ -69,7 +126,9 @@ class SpectrumWidget(QWidget):
         layout.addLayout(toolbar)
 
         # Matplotlib figure
-        self.figure = Figure(figsize=(10, 5), dpi=100)
+        # Constrained layout runs as part of full draws only (resize, rescale,
+        # theme); blitted updates never trigger a layout pass
+        self.figure = Figure(figsize=(10, 5), dpi=100, layout="constrained")
         self.canvas = FigureCanvas(self.figure)
         layout.addWidget(self.canvas)
 
@@ -81,14 +140,16 @@ class SpectrumWidget(QWidget):
         self.ax.set_ylim(0, 100)
         self.ax.grid(True, alpha=0.3)
 
-        # Initial x values - will be updated when div changes
-        self.x_vals = np.arange(self.CHANNELS) * self._get_kev_per_channel()
-        self.line, = self.ax.plot(self.x_vals, self.spectrum, 'b-', linewidth=0.5)
+        # The lines and peak annotations are blitted over a cached background
+        # instead of redrawing the whole figure; full draws only happen when
+        # the axes change.
+        self.line, = self.ax.plot(self.x_vals, self.spectrum, 'b-', linewidth=0.5, animated=True)
         
         # For smoothed line (optional)
-        self.smooth_line, = self.ax.plot([], [], 'r-', linewidth=1.0, alpha=0.7)
+        self.smooth_line, = self.ax.plot([], [], 'r-', linewidth=1.0, alpha=0.7, animated=True)
 
-        self.figure.tight_layout()
+        self._bg = None
+        self.canvas.mpl_connect('draw_event', self._on_draw)
     
     def _get_kev_per_channel(self) -> float:
         """Get keV per channel for full resolution spectrum.
@@ -103,18 +164,50 @@ class SpectrumWidget(QWidget):
 
     def clear_spectrum(self):
         self.spectrum.fill(0)
-        self.filled_channels.clear()
+        self.filled_mask.fill(False)
+        self._filled_count = 0
+        self._spectrum_version += 1
         self._clear_annotations()
         self._redraw()
         self.status_label.setText(f"Channels: 0 / {self.CHANNELS}")
 
     def _clear_annotations(self):
-        """Remove all peak annotations."""
-        for ann in self.peak_annotations:
-            ann.remove()
-        self.peak_annotations.clear()
+        """Hide all peak annotations (they stay in the pool for reuse)."""
+        for ann in self._ann_pool[:self._ann_shown]:
+            ann.set_visible(False)
+        self._ann_shown = 0
+
+    def _show_annotations(self, peaks: List[int], data: np.ndarray, kev_per_ch: float):
+        """Label the given peak channels, reusing pooled annotations."""
+        pool = self._ann_pool
+        for i, ch in enumerate(peaks):
+            energy = ch * kev_per_ch
+            count = data[ch]
+            text = f'ch{ch}\n{energy:.0f}keV'
+            if i < len(pool):
+                ann = pool[i]
+                ann.set_text(text)
+                ann.xy = (energy, count)
+                ann.set_visible(True)
+            else:
+                # Create annotation with channel and energy
+                pool.append(self.ax.annotate(
+                    text,
+                    xy=(energy, count),
+                    xytext=(0, 15),
+                    textcoords='offset points',
+                    ha='center',
+                    va='bottom',
+                    fontsize=8,
+                    color='red',
+                    arrowprops=dict(arrowstyle='->', color='red', lw=0.5),
+                    animated=True,
+                ))
+        for ann in pool[len(peaks):self._ann_shown]:
+            ann.set_visible(False)
+        self._ann_shown = len(peaks)
 
-    def update_spectrum(self, pkt: Dict):
+    def update_spectrum(self, pkt: Dict, redraw: bool = True):
         """Update spectrum from a parsed spectrum packet.
         
         Different packet types have different channel density:
@@ -122,47 +215,64 @@ class SpectrumWidget(QWidget):
         - 0x31 (div=3): ~600 channels, medium resolution, FRAGMENT
         - 0x30 (div=1): ~1800 channels, full resolution, FRAGMENT
         
-        Parser returns channels in COMPRESSED indices (divided by div).
+        Parser returns a dense array of values for COMPRESSED channels
+        start_x .. start_x + len(bins_arr) - 1 (indices divided by div).
         We expand them here to full resolution (1800 channels).
         Each compressed channel maps to 'div' consecutive full-res channels.
+        With redraw=False the plot is left for the caller to refresh,
+        otherwise a redraw is scheduled (at most every REDRAW_INTERVAL_MS).
         """
-        bins = pkt.get("bins", {})
+        bins_arr = pkt.get("bins_arr")
+        if bins_arr is None:
+            return
+        start_x = pkt.get("start_x", 0)
         div = pkt.get("div", 9)
         
-        for ch, val in bins.items():
-            ch = int(ch)
-            # Map compressed channel to full resolution spectrum
-            # ch=10 with div=3 → real channels 30-32 (10*3 to 10*3+2)
-            base_ch = ch * div
-            for i in range(div):
-                real_ch = base_ch + i
-                if 0 <= real_ch < self.CHANNELS:
-                    self.spectrum[real_ch] = val
-                    self.filled_channels.add(real_ch)
-
-        self.status_label.setText(f"Channels: {len(self.filled_channels)} (div={div})")
-        self._redraw()
+        # Compressed channel ch covers full-res channels ch*div .. ch*div+div-1
+        # (ch=10, div=3 → 30-32), so the tile is one contiguous full-res run
+        lo = start_x * div
+        hi = min((start_x + len(bins_arr)) * div, self.CHANNELS)
+        if hi > lo:
+            self.spectrum[lo:hi] = np.repeat(bins_arr, div)[:hi - lo]
+            tile_mask = self.filled_mask[lo:hi]
+            self._filled_count += (hi - lo) - int(np.count_nonzero(tile_mask))
+            tile_mask[:] = True
+            self._spectrum_version += 1
 
-    def _find_peaks(self, data: np.ndarray) -> List[int]:
-        """Find peaks in spectrum data."""
+        self.status_label.setText(f"Channels: {self._filled_count} (div={div})")
+        self._settle_timer.start()
+        if redraw:
+            self.schedule_redraw()
+
+    def schedule_redraw(self, *_):
+        """Redraw on the next redraw tick; nothing to do while empty."""
+        if not self._redraw_timer.isActive() and self._filled_count:
+            self._redraw_timer.start()
+
+    def _find_peaks(self, data: np.ndarray, data_max: Optional[float] = None) -> List[int]:
+        """Find peaks in spectrum data.
+
+        data_max is the maximum of data within the displayed range, if the
+        caller already has it.
+        """
         if not HAS_SCIPY:
             return []
         
-        kev_per_ch = self._get_kev_per_channel()
-        
-        # Only look within displayed range
-        max_ch = int(self.MAX_KEV / kev_per_ch)
-        max_ch = min(max_ch, len(data))
-        data_range = data[:max_ch]
+        # Only look within displayed range (a view, not a copy)
+        data_range = data[:self._max_ch]
         
-        if len(data_range) == 0 or data_range.max() < 5:
+        if len(data_range) == 0:
+            return []
+        if data_max is None:
+            data_max = data_range.max()
+        if data_max < 5:
             return []
         
         # Use configurable sensitivity (1-100 maps to 10%-1% of max for threshold)
         # Higher sensitivity = lower threshold = more peaks detected
         sensitivity_factor = (101 - self.peak_sensitivity) / 100.0  # 0.01 to 1.0
-        height_threshold = max(data_range.max() * sensitivity_factor * 0.1, 3)
-        prominence = max(data_range.max() * sensitivity_factor * 0.05, 2)
+        height_threshold = max(data_max * sensitivity_factor * 0.1, 3)
+        prominence = max(data_max * sensitivity_factor * 0.05, 2)
         
         peaks, properties = find_peaks(
             data_range,
@@ -175,7 +285,11 @@ class SpectrumWidget(QWidget):
         return list(peaks)
 
     def _smooth_spectrum(self, data: np.ndarray) -> np.ndarray:
-        """Apply Savitzky-Golay filter for smoothing."""
+        """Apply Savitzky-Golay filter for smoothing.
+
+        Same result as savgol_filter(data, window, 3), but the coefficients
+        are cached per window instead of being re-solved on every redraw.
+        """
         if not HAS_SCIPY:
             return data
         
@@ -186,19 +300,32 @@ class SpectrumWidget(QWidget):
         if window < 5:
             return data
         
-        return savgol_filter(data, window, 3)
+        coeffs, edges = _sg_kernels(window)
+        half = window // 2
+        smoothed = np.convolve(data, coeffs, mode="same")
+        smoothed[:half] = edges[:half] @ data[:window]
+        smoothed[-half:] = edges[half + 1:] @ data[-window:]
+        return smoothed
 
-    def set_peak_sensitivity(self, value: int):
-        """Set peak detection sensitivity (1-100)."""
-        self.peak_sensitivity = max(1, min(100, value))
-        self.settings.setValue("peak/sensitivity", self.peak_sensitivity)
+    def set_peak_sensitivity(self, value: int) -> bool:
+        """Set peak detection sensitivity (1-100). Returns True if it changed."""
+        value = max(1, min(100, value))
+        if value == self.peak_sensitivity:
+            return False
+        self.peak_sensitivity = value
+        set_setting("peak/sensitivity", value)
+        return True
 
-    def set_smooth_window(self, value: int):
-        """Set smoothing window size (odd number 5-51)."""
+    def set_smooth_window(self, value: int) -> bool:
+        """Set smoothing window size (odd number 5-51). Returns True if it changed."""
         if value % 2 == 0:
             value += 1
-        self.smooth_window = max(5, min(51, value))
-        self.settings.setValue("smooth/window", self.smooth_window)
+        value = max(5, min(51, value))
+        if value == self.smooth_window:
+            return False
+        self.smooth_window = value
+        set_setting("smooth/window", value)
+        return True
 
     def set_theme(self, theme: str):
         """Set the theme for the spectrum plot ('light' or 'dark')."""
@@ -235,59 +362,80 @@ class SpectrumWidget(QWidget):
             self.line.set_color('b')
             self.smooth_line.set_color('r')
         
+        self._bg = None  # cached background has the old colors
         self._redraw()
 
+    def _draw_animated(self):
+        self.ax.draw_artist(self.line)
+        self.ax.draw_artist(self.smooth_line)
+        for ann in self._ann_pool[:self._ann_shown]:
+            self.ax.draw_artist(ann)
+
+    def _on_draw(self, event):
+        """Re-capture the background after a full draw and overlay the plot."""
+        # Whole figure, not just the axes: peak labels can stick out above
+        self._bg = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_animated()
+
     def _redraw(self):
-        # Clear old annotations
-        self._clear_annotations()
-        
-        kev_per_ch = self._get_kev_per_channel()
-        
-        # Update x values for current div
-        self.x_vals = np.arange(self.CHANNELS) * kev_per_ch
+        # While tiles are streaming in draw every other channel and leave the
+        # peak annotations as they are; the settle timer redraws in full, and
+        # so does any redraw MAX_PREVIEW_MS after the last full one
+        now = time.monotonic()
+        preview = (self._settle_timer.isActive()
+                   and now - self._last_full_redraw < self.MAX_PREVIEW_MS / 1000.0)
+        if not preview:
+            self._last_full_redraw = now
+        step = 2 if preview else 1
+
+        kev_per_ch = self._kev_per_ch
         
-        # Get display data
-        display_data = self.spectrum.copy()
+        # Line2D keeps its own copy of the data, no need to copy here
+        display_data = self.spectrum
         
         # Apply smoothing if enabled
-        if self.smooth_checkbox.isChecked() and HAS_SCIPY:
-            smoothed = self._smooth_spectrum(display_data)
-            self.smooth_line.set_data(self.x_vals, smoothed)
+        smoothing = self.smooth_checkbox.isChecked() and HAS_SCIPY
+        if smoothing:
+            key = (self._spectrum_version, self.smooth_window)
+            cached_key, smoothed = self._smooth_cache
+            if key != cached_key:
+                smoothed = self._smooth_spectrum(display_data)
+                self._smooth_cache = (key, smoothed)
+            self.smooth_line.set_data(self.x_vals[::step], smoothed[::step])
             self.line.set_alpha(0.3)
         else:
             self.smooth_line.set_data([], [])
             self.line.set_alpha(1.0)
         
-        self.line.set_data(self.x_vals, display_data)
-        
-        # Find and annotate peaks
-        if self.peak_checkbox.isChecked():
+        self.line.set_data(self.x_vals[::step], display_data[::step])
+        max_ch = self._max_ch
+        data_max = display_data[:max_ch].max() if max_ch > 0 else 0
+
+        # Find and annotate peaks (left as they are while previewing)
+        if not preview and self.peak_checkbox.isChecked():
             # Use smoothed data for peak detection if smoothing enabled
-            peak_data = smoothed if (self.smooth_checkbox.isChecked() and HAS_SCIPY) else display_data
-            peaks = self._find_peaks(peak_data)
-            
-            for ch in peaks:
-                energy = ch * kev_per_ch
-                count = display_data[ch]
-                
-                # Create annotation with channel and energy
-                ann = self.ax.annotate(
-                    f'ch{ch}\n{energy:.0f}keV',
-                    xy=(energy, count),
-                    xytext=(0, 15),
-                    textcoords='offset points',
-                    ha='center',
-                    va='bottom',
-                    fontsize=8,
-                    color='red',
-                    arrowprops=dict(arrowstyle='->', color='red', lw=0.5)
-                )
-                self.peak_annotations.append(ann)
+            key = (self._spectrum_version, self.peak_sensitivity, smoothing, self.smooth_window)
+            cached_key, peaks = self._peaks_cache
+            if key != cached_key:
+                if smoothing:
+                    peaks = self._find_peaks(smoothed)
+                else:
+                    peaks = self._find_peaks(display_data, data_max)
+                self._peaks_cache = (key, peaks)
+            self._show_annotations(peaks, display_data, kev_per_ch)
+        elif not preview:
+            self._clear_annotations()
         
         # Update Y limits based on visible range
-        max_ch = int(self.MAX_KEV / kev_per_ch)
-        max_ch = min(max_ch, len(display_data))
-        visible_max = max(display_data[:max_ch].max() if max_ch > 0 else 10, 10)
-        self.ax.set_ylim(0, visible_max * 1.15)
-        
-        self.canvas.draw_idle()
+        visible_max = max(data_max, 10)
+        # Keep the current limit while the peak stays within 5-50% below it,
+        # so growing counts don't force a full redraw on every tile
+        top = self.ax.get_ylim()[1]
+        if self._bg is None or not top / 1.5 <= visible_max <= top / 1.05:
+            # Axes changed: full redraw, _on_draw refreshes the background
+            self.ax.set_ylim(0, float(visible_max) * 1.15)
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self._bg)
+        self._draw_animated()
+        self.canvas.blit(self.figure.bbox)
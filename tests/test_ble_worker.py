@@ -0,0 +1,108 @@
+"""BleWorker frame handling."""
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+from PyQt5.QtCore import Qt
+
+from raysid import ble_worker
+from raysid.ble_worker import BleWorker
+
+
+def _spectrum_frame(ptype: int = 0x32) -> bytes:
+    """A small valid spectrum frame: header, a few 8-bit diffs, checksum3."""
+    body = bytes([0x00, ptype, 0x00, 0x00, 0x10, 0x00, 0x00, 0x44, 1, 2, 0xFF, 3])
+    body = bytes([len(body) + 3]) + body[1:]
+    return body + BleWorker._checksum3(body).to_bytes(3, "little")
+
+
+@pytest.mark.skipif(not ble_worker.HAS_NUMBA, reason="numba not installed")
+def test_jit_warmup_covers_production_signatures():
+    worker = BleWorker("AA:BB:CC:DD:EE:FF", asyncio.new_event_loop())
+    kernels = [decode for _, decode in ble_worker._SPECTRUM_DECODERS.values()]
+    kernels += [ble_worker._crc1_kernel, ble_worker._checksum3_kernel]
+    before = [list(k.signatures) for k in kernels]
+
+    # What production passes: read-only views of bytes frames
+    readonly = ble_worker.numba.typeof(np.frombuffer(b"\x00", dtype=np.uint8))
+    for sigs in before:
+        assert any(sig[0] == readonly for sig in sigs)
+
+    for ptype in BleWorker.SPECTRUM_TYPES:
+        assert worker._parse_spectrum(_spectrum_frame(ptype)) is not None
+    worker._wrap_command(bytes([0x12, 1, 0, 0, 0, 0]))
+    BleWorker._crc1(bytearray(6))  # send_ping patches a bytearray
+
+    assert [list(k.signatures) for k in kernels] == before
+
+
+def test_parse_spectrum_decodes_diffs():
+    worker = BleWorker("AA:BB:CC:DD:EE:FF", asyncio.new_event_loop())
+    pkt = worker._parse_spectrum(_spectrum_frame(0x30))
+    assert pkt["div"] == 1
+    assert pkt["bins_arr"].tolist() == [16, 17, 19, 18, 21]
+
+
+def _collecting_worker(flush_interval_ms=BleWorker.DEFAULT_FLUSH_MS):
+    """A worker whose packets_received batches land in the returned list."""
+    worker = BleWorker("AA:BB:CC:DD:EE:FF", asyncio.new_event_loop(), flush_interval_ms)
+    batches = []
+    # Direct, so the batches are recorded on the parse thread without a Qt loop
+    worker.packets_received.connect(batches.append, Qt.DirectConnection)
+    return worker, batches
+
+
+def test_parse_thread_batches_in_arrival_order():
+    worker, batches = _collecting_worker(flush_interval_ms=30)
+    ptypes = [0x30, 0x31, 0x32, 0x30]
+    expected = [worker._parse_spectrum(_spectrum_frame(p))["div"] for p in ptypes]
+
+    worker._start_parser()
+    thread = worker._parse_thread
+    for ptype in ptypes[:3]:
+        worker._submit_frame(_spectrum_frame(ptype))
+    time.sleep(0.2)  # past the flush deadline: the first three go out together
+    worker._submit_frame(_spectrum_frame(ptypes[3]))
+    worker._stop_parser()
+    thread.join(timeout=2)
+
+    assert [[p["div"] for p in batch] for batch in batches] == [expected[:3], expected[3:]]
+
+
+def test_full_frame_queue_drops_overflow():
+    worker, batches = _collecting_worker()
+    frames = [_spectrum_frame(0x30) for _ in range(BleWorker.FRAME_QUEUE_SIZE + 5)]
+    for frame in frames:  # no parse thread yet, so nothing drains the queue
+        worker._submit_frame(frame)
+    assert worker._frame_queue.qsize() == BleWorker.FRAME_QUEUE_SIZE
+
+    thread = threading.Thread(target=worker._parse_loop, args=(worker._frame_queue,))
+    thread.start()
+    worker._frame_queue.put(None)
+    thread.join(timeout=2)
+
+    assert sum(len(batch) for batch in batches) == BleWorker.FRAME_QUEUE_SIZE
+
+
+def test_stop_parser_flushes_and_exits():
+    # A long flush interval, so only the stop sentinel can flush the batch
+    worker, batches = _collecting_worker(flush_interval_ms=10_000)
+    worker._start_parser()
+    thread = worker._parse_thread
+    worker._submit_frame(_spectrum_frame(0x32))
+    worker._stop_parser()
+    thread.join(timeout=2)
+
+    assert not thread.is_alive()
+    assert worker._parse_thread is None
+    assert len(batches) == 1 and len(batches[0]) == 1
+
+    # A restart gets a fresh queue, untouched by the old sentinel
+    worker._start_parser()
+    restarted = worker._parse_thread
+    assert restarted is not thread and restarted.is_alive()
+    worker._stop_parser()
+    restarted.join(timeout=2)
+    assert not restarted.is_alive()
@@ -0,0 +1,108 @@
+"""MainWindow connection handling, driven with a fake BLE worker."""
+import asyncio
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+qasync = pytest.importorskip("qasync")
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from raysid.widgets.main_window import MainWindow  # noqa: E402
+
+
+class FakeWorker:
+    """Stands in for BleWorker; disconnect() reports the loss like bleak does."""
+
+    device_address = "AA:BB:CC:DD:EE:FF"
+    client = None
+
+    def __init__(self, window):
+        self.window = window
+        self.connects = 0
+
+    async def connect(self):
+        self.connects += 1
+
+    async def disconnect(self):
+        # bleak invokes disconnected_callback for user-initiated disconnects too
+        self.window._on_connection_lost()
+
+    async def send_ping(self, tab):
+        pass
+
+
+@pytest.fixture(scope="module")
+def loop():
+    app = QApplication.instance() or QApplication([])
+    loop = qasync.QEventLoop(app)
+    asyncio.set_event_loop(loop)
+    yield loop
+
+
+@pytest.fixture
+def window(loop, monkeypatch):
+    monkeypatch.setattr(MainWindow, "RECONNECT_BASE_DELAY_S", 0.01)
+    w = MainWindow(loop)
+    yield w
+    w._cancel_reconnect()
+
+
+def test_manual_disconnect_does_not_reconnect(loop, window):
+    worker = FakeWorker(window)
+    window.ble_worker = worker
+    window._on_connected("Connected!")
+
+    loop.run_until_complete(window._on_disconnect())
+    loop.run_until_complete(asyncio.sleep(0.1))
+
+    assert window._reconnect_task is None
+    assert worker.connects == 0
+    assert not window.connected
+
+
+def test_lost_link_reconnects(loop, window):
+    worker = FakeWorker(window)
+    window.ble_worker = worker
+    window._on_connected("Connected!")
+
+    window._on_connection_lost()
+    assert window._reconnect_task is not None
+    loop.run_until_complete(asyncio.sleep(0.1))
+
+    assert worker.connects == 1
+    assert window.connected
+
+
+class SlowDisconnectWorker:
+    """Worker whose disconnect takes a few loop iterations, like bleak's."""
+
+    device_address = "AA:BB:CC:DD:EE:FF"
+
+    def __init__(self):
+        self.client = self
+        self.is_connected = True
+        self.connected = True
+        self.disconnects = 0
+        self.finished = False
+
+    async def disconnect(self):
+        self.disconnects += 1
+        await asyncio.sleep(0.05)
+        self.is_connected = self.connected = False
+        self.finished = True
+
+
+def test_scheduled_disconnect_completes_on_exit(loop, window):
+    from raysid.__main__ import _shutdown
+
+    worker = SlowDisconnectWorker()
+    window.ble_worker = worker
+    window.force_cleanup()
+    assert window.disconnect_task is not None
+
+    _shutdown(loop, window)
+
+    assert worker.finished
+    assert worker.disconnects == 1
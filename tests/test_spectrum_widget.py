@@ -0,0 +1,74 @@
+"""SpectrumWidget drawing and smoothing."""
+import os
+
+import numpy as np
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QEventLoop, QTimer  # noqa: E402
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from raysid.widgets import spectrum_widget  # noqa: E402
+from raysid.widgets.spectrum_widget import SpectrumWidget  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    return QApplication.instance() or QApplication([])
+
+
+def _tile(second_peak=False):
+    """A div=9 tile covering the whole spectrum with one or two clear peaks."""
+    bins = np.full(200, 20.0)
+    bins[99:102] = (300.0, 500.0, 300.0)
+    if second_peak:
+        bins[49:52] = (200.0, 400.0, 200.0)
+    return {"type": "spectrum", "bins_arr": bins, "start_x": 0, "div": 9}
+
+
+@pytest.mark.skipif(not spectrum_widget.HAS_SCIPY, reason="scipy not installed")
+def test_streaming_tiles_still_get_peak_labels(qapp):
+    widget = SpectrumWidget()
+    ticks = []
+
+    def feed_tile():
+        # A second peak appears 0.5 s into the stream
+        ticks.append(widget._ann_shown)
+        widget.update_spectrum(_tile(second_peak=len(ticks) > 10))
+
+    # Tiles every 50 ms, well inside STREAM_SETTLE_MS, for 2.5 s
+    feed = QTimer()
+    feed.setInterval(50)
+    feed.timeout.connect(feed_tile)
+    feed.start()
+
+    loop = QEventLoop()
+    QTimer.singleShot(2500, loop.quit)
+    loop.exec_()
+    feed.stop()
+
+    # The stream never paused, so only the preview cap can have relabelled
+    assert widget._settle_timer.isActive()
+    assert max(ticks) == 2
+
+
+@pytest.mark.skipif(not spectrum_widget.HAS_SCIPY, reason="scipy not installed")
+@pytest.mark.parametrize("length", [1800, 60])
+def test_smoothing_matches_savgol_filter(qapp, length):
+    from scipy.signal import savgol_filter
+
+    widget = SpectrumWidget()
+    rng = np.random.default_rng(0)
+    data = rng.poisson(200.0, length).astype(np.float32)
+
+    # Every window the slider allows; short spectra clamp it to len // 4
+    for window in range(5, 52, 2):
+        widget.smooth_window = window
+        effective = min(window, length // 4)
+        effective -= 1 - effective % 2
+        expected = savgol_filter(data.astype(np.float64), effective, 3, mode="interp")
+
+        # Whole array, so the first and last window // 2 edge samples too
+        smoothed = widget._smooth_spectrum(data)
+        np.testing.assert_allclose(smoothed, expected, rtol=1e-4, atol=1e-2)